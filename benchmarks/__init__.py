@@ -0,0 +1,4 @@
+"""
+Ferramentas para medir o desempenho dos comandos do bot sem depender dos
+serviços reais (Bill, PokeAPI, Google Sheets, Showdown e Discord).
+"""
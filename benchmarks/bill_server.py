@@ -0,0 +1,882 @@
+"""
+Servidor local que substitui o Bill durante os benchmarks.
+
+Implementa, com graphql-core, o subconjunto do schema do Bill utilizado pelo
+bot (ligas, treinadores, líderes, scores, batalhas e suas mutations) sobre uma
+base de dados gerada em memória, com latência e tamanho configuráveis. Também
+responde às rotas da PokeAPI e aos quotes do BACKEND_URL, para que todos os
+comandos possam ser exercitados sem rede.
+
+Cada requisição é contabilizada por campo raiz em `stats`.
+
+Uso:
+    python -m benchmarks.bill_server --port 8000 --latency 40 --trainers 500
+"""
+import argparse
+import json
+import logging
+import sys
+import threading
+from base64 import b64decode, b64encode
+from collections import Counter
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from random import Random
+from socketserver import ThreadingMixIn
+from time import sleep
+from urllib.parse import unquote, urlparse
+
+from graphql import build_ast_schema, graphql, parse
+from graphql.error import format_error
+
+
+SCHEMA = '''
+type PageInfo {
+  hasNextPage: Boolean!
+  hasPreviousPage: Boolean!
+  startCursor: String
+  endCursor: String
+}
+
+type TrainerType {
+  id: ID!
+  discordId: String
+  name: String
+  joinDate: String
+  battleCounter: Int
+  badgeCounter: Int
+  leaguesCounter: Int
+  winPercentage: Float
+  loosePercentage: Float
+  lv: Int
+  exp: Int
+  nextLv: Int
+  fc: String
+  sdId: String
+}
+
+type TrainerTypeEdge {
+  cursor: String!
+  node: TrainerType
+}
+
+type TrainerTypeConnection {
+  pageInfo: PageInfo!
+  edges: [TrainerTypeEdge]!
+}
+
+type LeaderType {
+  id: ID!
+  discordId: String
+  name: String
+  role: String
+  pokemonType: String
+  clauses: String
+  joinDate: String
+  battleCounter: Int
+  winPercentage: Float
+  loosePercentage: Float
+  lv: Int
+  exp: Int
+  nextLv: Int
+  fc: String
+  sdId: String
+}
+
+type LeaderTypeEdge {
+  cursor: String!
+  node: LeaderType
+}
+
+type LeaderTypeConnection {
+  pageInfo: PageInfo!
+  edges: [LeaderTypeEdge]!
+}
+
+type LeagueType {
+  id: ID!
+  reference: String
+  description: String
+  startDate: String
+  endDate: String
+  gymLeaders(first: Int, after: String): LeaderTypeConnection
+  eliteFour(first: Int, after: String): LeaderTypeConnection
+  champion: LeaderType
+  competitors(first: Int, after: String): TrainerTypeConnection
+  winner: TrainerType
+}
+
+type LeagueTypeEdge {
+  cursor: String!
+  node: LeagueType
+}
+
+type LeagueTypeConnection {
+  pageInfo: PageInfo!
+  edges: [LeagueTypeEdge]!
+}
+
+type BattleType {
+  id: ID!
+  battleDatetime: String
+  winner: String
+  trainer: TrainerType
+  leader: LeaderType
+}
+
+type BattleTypeEdge {
+  cursor: String!
+  node: BattleType
+}
+
+type BattleTypeConnection {
+  pageInfo: PageInfo!
+  edges: [BattleTypeEdge]!
+}
+
+type ScoreType {
+  id: ID!
+  trainer: TrainerType
+  league: LeagueType
+  wins: Int
+  losses: Int
+  badges: [String]
+  standby: Boolean
+  battles(first: Int, after: String, last: Int): BattleTypeConnection
+}
+
+type ScoreTypeEdge {
+  cursor: String!
+  node: ScoreType
+}
+
+type ScoreTypeConnection {
+  pageInfo: PageInfo!
+  edges: [ScoreTypeEdge]!
+}
+
+type Query {
+  leagues(id: ID, first: Int, after: String): LeagueTypeConnection
+  trainers(discordId_Icontains: String, first: Int, after: String): TrainerTypeConnection
+  leaders(discordId_Icontains: String, first: Int, after: String): LeaderTypeConnection
+  scores(league_Id_In: ID, trainer_DiscordId: String, first: Int, after: String): ScoreTypeConnection
+  apiVersion: String
+  abpQuotes: [String]
+}
+
+input CreateTrainerInput {
+  discordId: String!
+  clientMutationId: String
+}
+
+type CreateTrainerPayload {
+  trainer: TrainerType
+  clientMutationId: String
+}
+
+input CreateLeagueInput {
+  reference: String!
+  clientMutationId: String
+}
+
+type CreateLeaguePayload {
+  league: LeagueType
+  clientMutationId: String
+}
+
+input CreateLeaderInput {
+  discordId: String!
+  pokemonType: String!
+  role: String!
+  clientMutationId: String
+}
+
+type CreateLeaderPayload {
+  leader: LeaderType
+  clientMutationId: String
+}
+
+input LeagueRegistrationInput {
+  discordId: String!
+  league: ID!
+  isTrainer: Boolean!
+  clientMutationId: String
+}
+
+type LeagueRegistrationPayload {
+  registration: String
+  clientMutationId: String
+}
+
+input BattleRegisterInput {
+  league: ID!
+  trainer: String!
+  leader: String!
+  winner: String!
+  clientMutationId: String
+}
+
+type BattleRegisterPayload {
+  battle: BattleType
+  clientMutationId: String
+}
+
+input AddBadgeToTrainerInput {
+  discordId: String!
+  badge: String!
+  league: ID!
+  clientMutationId: String
+}
+
+type AddBadgeToTrainerPayload {
+  response: String
+  clientMutationId: String
+}
+
+input UpdateTrainerInput {
+  discordId: String!
+  name: String
+  fc: String
+  sdId: String
+  clientMutationId: String
+}
+
+type UpdateTrainerPayload {
+  trainer: TrainerType
+  clientMutationId: String
+}
+
+input UpdateLeaderInput {
+  discordId: String!
+  name: String
+  fc: String
+  sdId: String
+  clauses: String
+  pokemonType: String
+  role: String
+  clientMutationId: String
+}
+
+type UpdateLeaderPayload {
+  leader: LeaderType
+  clientMutationId: String
+}
+
+input UpdateLeagueInput {
+  id: ID!
+  reference: String
+  startDate: String
+  endDate: String
+  clientMutationId: String
+}
+
+type UpdateLeaguePayload {
+  league: LeagueType
+  clientMutationId: String
+}
+
+input CreateAbpQuoteInput {
+  quote: String!
+  clientMutationId: String
+}
+
+type CreateAbpQuotePayload {
+  response: String
+  clientMutationId: String
+}
+
+type Mutation {
+  createTrainer(input: CreateTrainerInput!): CreateTrainerPayload
+  createLeague(input: CreateLeagueInput!): CreateLeaguePayload
+  createLeader(input: CreateLeaderInput!): CreateLeaderPayload
+  leagueRegistration(input: LeagueRegistrationInput!): LeagueRegistrationPayload
+  battleRegister(input: BattleRegisterInput!): BattleRegisterPayload
+  addBadgeToTrainer(input: AddBadgeToTrainerInput!): AddBadgeToTrainerPayload
+  updateTrainer(input: UpdateTrainerInput!): UpdateTrainerPayload
+  updateLeader(input: UpdateLeaderInput!): UpdateLeaderPayload
+  updateLeague(input: UpdateLeagueInput!): UpdateLeaguePayload
+  createAbpQuote(input: CreateAbpQuoteInput!): CreateAbpQuotePayload
+}
+
+schema {
+  query: Query
+  mutation: Mutation
+}
+'''
+
+POKEMON_TYPES = [
+    'normal', 'fire', 'water', 'grass', 'electric', 'ice', 'fighting',
+    'poison', 'ground', 'flying', 'psychic', 'bug', 'rock', 'ghost', 'dark',
+    'dragon', 'steel', 'fairy'
+]
+LEADER_ROLES = ['GYM_LEADER', 'ELITE_FOUR', 'CHAMPION']
+STATS = ['speed', 'special-defense', 'special-attack', 'defense', 'attack', 'hp']
+
+# erros de negócio (ex.: UNIQUE) já são devolvidos na resposta
+logging.getLogger('graphql.execution').setLevel(logging.CRITICAL)
+
+
+def global_id(type_name, pk):
+    """
+    Id relay no formato utilizado pelo Bill: base64('<Tipo>:<pk>').
+    """
+    return b64encode(f'{type_name}:{pk}'.encode('utf-8')).decode('utf-8')
+
+
+def _cursor(offset):
+    return b64encode(f'arrayconnection:{offset}'.encode('utf-8')).decode('utf-8')
+
+
+def _offset(cursor):
+    return int(b64decode(cursor).decode('utf-8').split(':')[1])
+
+
+def connection(items, first=None, after=None, last=None):
+    """
+    Monta uma connection relay (edges e pageInfo) de uma lista de nós.
+    """
+    start = _offset(after) + 1 if after else 0
+    end = len(items)
+    if first is not None:
+        end = min(end, start + first)
+    if last is not None:
+        start = max(start, end - last)
+
+    edges = [{'cursor': _cursor(i), 'node': items[i]} for i in range(start, end)]
+    return {
+        'edges': edges,
+        'pageInfo': {
+            'hasNextPage': end < len(items),
+            'hasPreviousPage': start > 0,
+            'startCursor': edges[0]['cursor'] if edges else None,
+            'endCursor': edges[-1]['cursor'] if edges else None,
+        }
+    }
+
+
+def resolve(next, source, info, **args):
+    """
+    Middleware de resolução: os nós são dicionários e campos com argumentos
+    são funções, chamadas com os argumentos da query.
+    """
+    value = source.get(info.field_name) if isinstance(source, dict) else None
+    if callable(value):
+        return value(**args)
+    return value
+
+
+class BillData:
+    """
+    Base de dados em memória do servidor, gerada de forma determinística a
+    partir de `seed`.
+
+    Os treinadores têm discordId `<@1>` a `<@N>` e os líderes `<@100001>` em
+    diante; todos os treinadores competem em todas as ligas.
+    """
+
+    def __init__(self, trainers=200, leaders=30, leagues=3, seed=0):
+        self.random = Random(seed)
+        self.now = datetime(2020, 3, 1, 12, 0)
+        self.trainers = []
+        self.leaders = []
+        self.leagues = []
+        self.scores = []
+        self.quotes = ['Gotta catch em all!', 'Pika pika!']
+
+        for pk in range(1, trainers + 1):
+            self.trainers.append(self.new_trainer(pk, f'<@{pk}>'))
+
+        for pk in range(1, leaders + 1):
+            self.leaders.append(self.new_leader(
+                pk,
+                f'<@{100000 + pk}>',
+                self.random.choice(POKEMON_TYPES).upper(),
+                LEADER_ROLES[0] if pk > 5 else self.random.choice(LEADER_ROLES)
+            ))
+
+        for pk in range(1, leagues + 1):
+            league = self.new_league(pk, f'Liga {2019 + pk}')
+            league['_leaders'] = list(self.leaders)
+            self.leagues.append(league)
+
+            for trainer in self.trainers:
+                score = self.new_score(league, trainer)
+                for _ in range(self.random.randint(0, 4)):
+                    self.new_battle(score, self.random.choice(self.leaders))
+                score['standby'] = bool(score['_battles']) and self.random.random() < 0.2
+
+    def _date(self, days):
+        return (self.now - timedelta(days=days)).isoformat()
+
+    def _level(self, node):
+        node['lv'] = 1 + node['exp'] // 100
+        node['nextLv'] = node['lv'] * 100 - node['exp']
+
+    def new_trainer(self, pk, discord_id):
+        trainer = {
+            'id': global_id('TrainerType', pk),
+            'discordId': discord_id,
+            'name': f'Trainer {pk}',
+            'joinDate': self._date(self.random.randint(0, 365)),
+            'battleCounter': 0,
+            'badgeCounter': 0,
+            'leaguesCounter': 0,
+            'winPercentage': 0.0,
+            'loosePercentage': 0.0,
+            'exp': 0,
+            'fc': f'SW-{pk:04d}-0000-0000',
+            'sdId': f'trainer{pk}',
+        }
+        self._level(trainer)
+        return trainer
+
+    def new_leader(self, pk, discord_id, poke_type, role):
+        leader = {
+            'id': global_id('LeaderType', pk),
+            'discordId': discord_id,
+            'name': f'Leader {pk}',
+            'role': role,
+            'pokemonType': poke_type,
+            'clauses': '',
+            'joinDate': self._date(self.random.randint(0, 365)),
+            'battleCounter': 0,
+            'winPercentage': 0.0,
+            'loosePercentage': 0.0,
+            'exp': 0,
+            'fc': f'SW-{pk:04d}-1111-1111',
+            'sdId': f'leader{pk}',
+        }
+        self._level(leader)
+        return leader
+
+    def new_league(self, pk, reference):
+        league = {
+            'id': global_id('LeagueType', pk),
+            'reference': reference,
+            'description': f'Descrição da {reference}',
+            'startDate': '2020-01-01',
+            'endDate': '2020-12-31',
+            'winner': None,
+            '_leaders': [],
+            '_competitors': [],
+        }
+        league['gymLeaders'] = lambda **args: connection(
+            [l for l in league['_leaders'] if l['role'] == 'GYM_LEADER'], **args)
+        league['eliteFour'] = lambda **args: connection(
+            [l for l in league['_leaders'] if l['role'] == 'ELITE_FOUR'], **args)
+        league['champion'] = lambda: next(
+            (l for l in league['_leaders'] if l['role'] == 'CHAMPION'), None)
+        league['competitors'] = lambda **args: connection(league['_competitors'], **args)
+        return league
+
+    def new_score(self, league, trainer):
+        score = {
+            'id': global_id('ScoreType', len(self.scores) + 1),
+            'trainer': trainer,
+            'league': league,
+            'wins': 0,
+            'losses': 0,
+            'badges': [],
+            'standby': False,
+            '_battles': [],
+        }
+        score['battles'] = lambda **args: connection(score['_battles'], **args)
+        self.scores.append(score)
+        league['_competitors'].append(trainer)
+        trainer['leaguesCounter'] += 1
+        return score
+
+    def new_battle(self, score, leader, winner=None):
+        trainer = score['trainer']
+        if winner is None:
+            winner = self.random.choice([trainer, leader])['discordId']
+
+        battle = {
+            'id': global_id('BattleType', sum(len(s['_battles']) for s in self.scores) + 1),
+            'battleDatetime': self._date(self.random.randint(0, 60)),
+            'winner': winner,
+            'trainer': trainer,
+            'leader': leader,
+        }
+        score['_battles'].append(battle)
+
+        trainer_won = winner == trainer['discordId']
+        score['wins' if trainer_won else 'losses'] += 1
+        if trainer_won and leader['pokemonType'] != 'ALL':
+            badge = leader['pokemonType'].capitalize()
+            if badge not in score['badges']:
+                score['badges'].append(badge)
+                trainer['badgeCounter'] += 1
+
+        for node, won in [(trainer, trainer_won), (leader, not trainer_won)]:
+            wins = node['winPercentage'] * node['battleCounter'] / 100 + won
+            node['battleCounter'] += 1
+            node['winPercentage'] = round(wins * 100 / node['battleCounter'], 2)
+            node['loosePercentage'] = round(100 - node['winPercentage'], 2)
+            node['exp'] += 30 if won else 10
+            self._level(node)
+
+        return battle
+
+    def _get(self, items, key, value, name):
+        node = next((i for i in items if i[key] == value), None)
+        if node is None:
+            raise Exception(f'{name} matching query does not exist.')
+        return node
+
+    def root(self):
+        """
+        Valor raiz das queries e mutations.
+        """
+        def leagues(id=None, **args):
+            items = [l for l in self.leagues if id is None or l['id'] == id]
+            return connection(items, **args)
+
+        def trainers(discordId_Icontains=None, **args):
+            search = (discordId_Icontains or '').lower()
+            return connection(
+                [t for t in self.trainers if search in t['discordId'].lower()], **args)
+
+        def leaders(discordId_Icontains=None, **args):
+            search = (discordId_Icontains or '').lower()
+            return connection(
+                [l for l in self.leaders if search in l['discordId'].lower()], **args)
+
+        def scores(league_Id_In=None, trainer_DiscordId=None, **args):
+            league_ids = league_Id_In.split(',') if league_Id_In else None
+            items = [
+                s for s in self.scores
+                if (league_ids is None or s['league']['id'] in league_ids)
+                and (trainer_DiscordId is None or s['trainer']['discordId'] == trainer_DiscordId)
+            ]
+            return connection(items, **args)
+
+        def create_trainer(input):
+            if any(t['discordId'] == input['discordId'] for t in self.trainers):
+                raise Exception('UNIQUE constraint failed: bill_trainer.discord_id')
+            trainer = self.new_trainer(len(self.trainers) + 1, input['discordId'])
+            self.trainers.append(trainer)
+            return {'trainer': trainer}
+
+        def create_league(input):
+            if any(l['reference'] == input['reference'] for l in self.leagues):
+                raise Exception('UNIQUE constraint failed: bill_league.reference')
+            league = self.new_league(len(self.leagues) + 1, input['reference'])
+            self.leagues.append(league)
+            return {'league': league}
+
+        def create_leader(input):
+            if any(l['discordId'] == input['discordId'] for l in self.leaders):
+                raise Exception('UNIQUE constraint failed: bill_leader.discord_id')
+            leader = self.new_leader(
+                len(self.leaders) + 1,
+                input['discordId'],
+                input['pokemonType'],
+                input['role']
+            )
+            self.leaders.append(leader)
+            return {'leader': leader}
+
+        def league_registration(input):
+            league = self._get(self.leagues, 'id', input['league'], 'League')
+            if input['isTrainer']:
+                trainer = self._get(self.trainers, 'discordId', input['discordId'], 'Trainer')
+                if trainer in league['_competitors']:
+                    raise Exception('Trainer already registered in this league')
+                self.new_score(league, trainer)
+            else:
+                leader = self._get(self.leaders, 'discordId', input['discordId'], 'Leader')
+                if leader in league['_leaders']:
+                    raise Exception('Leader already registered in this league')
+                league['_leaders'].append(leader)
+            return {'registration': f'{input["discordId"]} registrado na {league["reference"]}!'}
+
+        def battle_register(input):
+            league = self._get(self.leagues, 'id', input['league'], 'League')
+            leader = self._get(self.leaders, 'discordId', input['leader'], 'Leader')
+            score = next((
+                s for s in self.scores
+                if s['league'] is league and s['trainer']['discordId'] == input['trainer']
+            ), None)
+            if score is None:
+                raise Exception('Score matching query does not exist.')
+            if score['standby']:
+                raise Exception('This trainer is in standby')
+            return {'battle': self.new_battle(score, leader, input['winner'])}
+
+        def add_badge(input):
+            league = self._get(self.leagues, 'id', input['league'], 'League')
+            score = next((
+                s for s in self.scores
+                if s['league'] is league and s['trainer']['discordId'] == input['discordId']
+            ), None)
+            if score is None:
+                raise Exception('Score matching query does not exist.')
+            badge = input['badge'].capitalize()
+            if badge in score['badges']:
+                raise Exception('This trainer already have this badge!')
+            score['badges'].append(badge)
+            score['trainer']['badgeCounter'] += 1
+            return {'response': f'{input["discordId"]} received the {badge} badge!'}
+
+        def update(items, name, payload, input):
+            node = self._get(items, 'discordId', input['discordId'], name)
+            node.update({k: v for k, v in input.items() if v and k != 'clientMutationId'})
+            return {payload: node}
+
+        def update_league(input):
+            league = self._get(self.leagues, 'id', input['id'], 'League')
+            league.update({
+                k: v for k, v in input.items() if v and k not in ('id', 'clientMutationId')
+            })
+            return {'league': league}
+
+        def create_quote(input):
+            self.quotes.append(input['quote'])
+            return {'response': 'Quote registrado!'}
+
+        return {
+            'leagues': leagues,
+            'trainers': trainers,
+            'leaders': leaders,
+            'scores': scores,
+            'apiVersion': lambda: '0.0.0-bench',
+            'abpQuotes': lambda: list(self.quotes),
+            'createTrainer': create_trainer,
+            'createLeague': create_league,
+            'createLeader': create_leader,
+            'leagueRegistration': league_registration,
+            'battleRegister': battle_register,
+            'addBadgeToTrainer': add_badge,
+            'updateTrainer': lambda input: update(self.trainers, 'Trainer', 'trainer', input),
+            'updateLeader': lambda input: update(self.leaders, 'Leader', 'leader', input),
+            'updateLeague': update_league,
+            'createAbpQuote': create_quote,
+        }
+
+
+class PokeData:
+    """
+    Dados gerados para as rotas da PokeAPI, a partir dos nomes em
+    files/pokes.txt.
+    """
+
+    def __init__(self, names, seed=0):
+        random = Random(seed)
+        self.pokemon = {}
+
+        for dex_num, name in enumerate(names, start=1):
+            types = random.sample(POKEMON_TYPES, random.randint(1, 2))
+            self.pokemon[name.lower()] = {
+                'id': dex_num,
+                'name': name.lower(),
+                'height': random.randint(2, 40),
+                'weight': random.randint(10, 2000),
+                'sprites': {'front_default': f'https://img.pokemondb.net/{dex_num}.png'},
+                'types': [
+                    {'slot': slot, 'type': {'name': poke_type}}
+                    for slot, poke_type in enumerate(types, start=1)
+                ],
+                'stats': [
+                    {'base_stat': random.randint(20, 150), 'stat': {'name': stat}}
+                    for stat in STATS
+                ],
+            }
+
+    def item(self, name):
+        return {
+            'name': name,
+            'sprites': {'default': f'https://img.pokemondb.net/items/{name}.png'},
+            'effect_entries': [{'effect': f'Efeito do item {name}.'}],
+            'category': {'name': 'held-items'},
+            'fling_power': 10,
+            'fling_effect': None,
+        }
+
+    def ability(self, name):
+        return {
+            'name': name,
+            'effect_entries': [{'effect': f'Efeito da habilidade {name}.'}],
+            'pokemon': [{'pokemon': {'name': n}} for n in list(self.pokemon)[:5]],
+        }
+
+
+class StandInServer(ThreadingMixIn, HTTPServer):
+    """
+    Servidor HTTP multi-thread com os dados do Bill e da PokeAPI.
+
+    param : latency : <float> : atraso, em segundos, de cada resposta.
+    param : jitter : <float> : variação aleatória máxima somada ao atraso.
+    """
+    daemon_threads = True
+
+    def __init__(self, address, bill_data, poke_data, latency=0.0, jitter=0.0):
+        super().__init__(address, StandInHandler)
+        self.bill_data = bill_data
+        self.poke_data = poke_data
+        self.latency = latency
+        self.jitter = jitter
+        self.schema = build_ast_schema(parse(SCHEMA))
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        self._random = Random()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/'
+
+    def handle_error(self, request, client_address):
+        # clientes que desistem da resposta (timeout) não são um erro
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def delay(self):
+        sleep(self.latency + self._random.uniform(0, self.jitter))
+
+    def count(self, *keys):
+        with self._lock:
+            self.stats.update(keys)
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats.clear()
+
+    def execute(self, query, variables=None):
+        """
+        Executa uma operação graphql, contabilizando cada campo raiz.
+        """
+        document = parse(query)
+        fields = [
+            selection.name.value
+            for definition in document.definitions
+            for selection in definition.selection_set.selections
+        ]
+        self.count('bill:requests', *(f'bill:{field}' for field in fields))
+
+        # a base em memória não é thread-safe: uma operação por vez
+        with self._lock:
+            result = graphql(
+                self.schema,
+                document,
+                root_value=self.bill_data.root(),
+                variable_values=variables,
+                middleware=[resolve],
+            )
+
+        response = {'data': result.data}
+        if result.errors:
+            response['errors'] = [format_error(error) for error in result.errors]
+        return response
+
+    def start(self):
+        """
+        Inicia o servidor em uma thread daemon.
+        """
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    # mantém a conexão aberta, como o Bill atrás de um proxy
+    protocol_version = 'HTTP/1.1'
+    # cabeçalho e corpo são escritos separadamente: sem TCP_NODELAY o delayed
+    # ACK do cliente somaria ~40ms a cada resposta
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        payload = json.loads(self.rfile.read(length) or b'{}')
+        self.server.delay()
+
+        try:
+            response = self.server.execute(payload.get('query', ''), payload.get('variables'))
+        except Exception as err:
+            return self._reply(400, {'errors': [{'message': str(err)}]})
+
+        self._reply(200, response)
+
+    def do_GET(self):
+        path = unquote(urlparse(self.path).path)
+        parts = [part for part in path.split('/') if part]
+
+        if parts == ['stats']:
+            return self._reply(200, dict(self.server.stats))
+
+        self.server.delay()
+        poke_data = self.server.poke_data
+
+        if len(parts) == 4 and parts[:2] == ['api', 'v2']:
+            resource, name = parts[2], parts[3].lower()
+            self.server.count(f'pokeapi:{resource}')
+
+            if resource == 'pokemon' and name in poke_data.pokemon:
+                return self._reply(200, poke_data.pokemon[name])
+            if resource == 'item':
+                return self._reply(200, poke_data.item(name))
+            if resource == 'ability':
+                return self._reply(200, poke_data.ability(name))
+
+        self._reply(404, {'detail': 'Not found.'})
+
+
+def create_server(host='127.0.0.1', port=0, latency=0.0, jitter=0.0,
+                  trainers=200, leaders=30, leagues=3, seed=0,
+                  pokes_file='files/pokes.txt'):
+    """
+    Cria o servidor substituto. Com `port` 0 uma porta livre é escolhida.
+
+    param : latency : <float> : atraso de cada resposta em segundos.
+    param : trainers : <int> : quantidade de treinadores gerados.
+    param : leaders : <int> : quantidade de líderes gerados.
+    param : leagues : <int> : quantidade de ligas geradas.
+
+    return : <StandInServer>
+    """
+    with open(pokes_file, 'r', encoding='utf-8') as f:
+        names = [line.strip() for line in f if line.strip()]
+
+    return StandInServer(
+        (host, port),
+        BillData(trainers, leaders, leagues, seed),
+        PokeData(names, seed),
+        latency,
+        jitter
+    )
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Servidor substituto do Bill')
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8000)
+    arg_parser.add_argument('--latency', type=float, default=0, help='latência em ms')
+    arg_parser.add_argument('--jitter', type=float, default=0, help='variação da latência em ms')
+    arg_parser.add_argument('--trainers', type=int, default=200)
+    arg_parser.add_argument('--leaders', type=int, default=30)
+    arg_parser.add_argument('--leagues', type=int, default=3)
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+
+    server = create_server(
+        args.host, args.port, args.latency / 1000, args.jitter / 1000,
+        args.trainers, args.leaders, args.leagues, args.seed
+    )
+    print(f'Bill: {server.url}')
+    print(f'PokeAPI: {server.url}api/v2/pokemon/')
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,404 @@
+"""
+Benchmark de latência dos comandos do bot.
+
+Executa cada comando registrado em commands.bot_commands com um contexto do
+Discord simulado, contra o servidor substituto do Bill e da PokeAPI
+(benchmarks.bill_server). As leituras do Google Sheets e os replays do
+Showdown são substituídos por dados gerados, com latência configurável.
+
+Para cada comando são informados os percentis p50/p95/p99 da latência e a
+quantidade média de chamadas feitas a cada serviço por execução.
+
+Uso:
+    python -m benchmarks.run --latency 40 --iterations 30 --concurrency 5
+    python -m benchmarks.run --commands scores view_trainers --cold
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import tempfile
+from collections import Counter
+from copy import deepcopy
+from datetime import datetime, timedelta
+from random import Random
+from time import perf_counter, sleep
+from types import SimpleNamespace
+
+from tabulate import tabulate
+
+from benchmarks.bill_server import create_server
+
+
+ADMIN_CHANNEL = 'admin-bench'
+TRAINER = '<@1>'
+LEADER = '<@100001>'
+
+# argumentos de cada comando; comandos ausentes são executados sem argumentos.
+# O terceiro item, quando presente, é o id do autor da mensagem.
+SCENARIOS = {
+    'quote': [('benchmark', 'quote')],
+    'top_ranked': [(), ('tabela',)],
+    'ranked_trainer': [('Trainer7',)],
+    'ranked_elo': [('ouro',), ('ouro', '2')],
+    'abp_db': [(), ('Trainer7',)],
+    'view_leagues': [(), ('liga1',)],
+    'view_trainers': [(), ('2',), ('5',), ('0',), (TRAINER,)],
+    'view_leaders': [(), (LEADER,)],
+    'new_trainer': [(TRAINER,)],
+    'new_league': [('Liga', 'Benchmark')],
+    'new_leader': [(LEADER, 'fire', 'gym_leader')],
+    'league_register': [('-t', TRAINER, 'liga1')],
+    'battle_register': [('liga1', '<@2>', LEADER, '<@2>')],
+    'add_badge': [(TRAINER, 'fire', 'liga1')],
+    'update_trainer': [(TRAINER, 'n', 'Red')],
+    'update_leader': [(LEADER, 'fc', '1234', 100001)],
+    'update_league': [('liga1', 'ref', 'Benchmark')],
+    'scores': [('liga1',), ('liga1', '2'), ('liga1', 'liga2')],
+    'trainer_score': [(TRAINER, 'liga1')],
+    'standby_trainers': [('liga1',)],
+}
+
+# comandos que dependem da conexão real com o Discord
+SKIP = {'help'}
+
+
+class FakeRole:
+    def __init__(self, name):
+        self.name = name
+
+
+class FakeMember:
+    def __init__(self, id, roles=()):
+        self.id = id
+        self.name = f'member{id}'
+        self.display_name = self.name
+        self.discriminator = '0001'
+        self.mention = f'<@{id}>'
+        self.color = 0x1E1E1E
+        self.roles = list(roles)
+        self.avatar_url = SimpleNamespace(_url=f'https://cdn.discordapp.com/avatars/{id}.png')
+
+    async def add_roles(self, *roles):
+        self.roles.extend(roles)
+
+
+class FakeContext:
+    """
+    Contexto de comando com os atributos utilizados pelos comandos do bot.
+    As mensagens enviadas ficam em `sent`.
+    """
+
+    def __init__(self, guild, author):
+        self.guild = guild
+        self.author = author
+        self.message = SimpleNamespace(channel=SimpleNamespace(name=ADMIN_CHANNEL))
+        self.sent = []
+
+    async def send(self, content=None, **kwargs):
+        self.sent.append((content, kwargs.get('embed')))
+
+
+def build_guild(trainers, leaders):
+    """
+    Servidor do Discord com um membro para cada treinador e líder do Bill.
+    """
+    roles = [FakeRole('ADM'), FakeRole('GYM LEADER'), FakeRole('Treinador da Liga')]
+    members = [FakeMember(id, roles[:2]) for id in range(1, trainers + 1)]
+    members += [FakeMember(100000 + id, roles[:2]) for id in range(1, leaders + 1)]
+    emojis = [
+        SimpleNamespace(name=f'badge_{name}', id=900 + i)
+        for i, name in enumerate(['fire', 'water', 'grass', 'dragon'])
+    ]
+    return SimpleNamespace(
+        members=members,
+        roles=roles,
+        emojis=emojis,
+        by_id={member.id: member for member in members}
+    )
+
+
+class FakeServices:
+    """
+    Planilhas da ranked e replays do Showdown gerados em memória.
+    """
+
+    def __init__(self, rows, sheets_latency=0.0, replay_latency=0.0, seed=0):
+        random = Random(seed)
+        self.sheets_latency = sheets_latency
+        self.replay_latency = replay_latency
+        self.calls = Counter()
+        self.replays = {}
+
+        ranked = [['Pos', 'Nick', 'Wins', 'Losses', 'Pts', 'Bts']]
+        for i in range(1, rows + 1):
+            wins, losses = random.randint(0, 60), random.randint(0, 60)
+            ranked.append([
+                str(i), f'Trainer{i}', str(wins), str(losses),
+                str(random.randint(0, 1100)), str(wins + losses)
+            ])
+
+        form = []
+        now = datetime.now()
+        for i in range(1, 21):
+            winner, loser = random.sample(ranked[1:], 2)
+            date = now - timedelta(hours=random.randint(0, 40))
+            url = f'https://replay.pokemonshowdown.com/gen8ou-{i}'
+            self.replays[url] = (winner[1], loser[1], date)
+            form.append([
+                date.strftime('%d/%m/%Y %H:%M:%S'), f'trainer{i}@abp.com',
+                winner[1], loser[1], url
+            ])
+
+        trainer_db = [
+            [f'Trainer{i}', f'member{i}#0001', f'SW-{i:04d}-0000-0000', f'trainer{i}']
+            for i in range(1, rows + 1)
+        ]
+
+        self.ranges = {
+            'Rank!A1:F255': ranked,
+            'Respostas ao formulário 2!A2:E255': form,
+            'Treinador-DB!B2:E255': trainer_db,
+        }
+
+    def fetch_spreadsheet_ranges(self, spreadsheet_id, cell_ranges):
+        sleep(self.sheets_latency)
+        self.calls['sheets'] += 1
+        return {cell_range: deepcopy(self.ranges[cell_range]) for cell_range in cell_ranges}
+
+    def fetch_spreadsheet_revision(self, spreadsheet_id):
+        # planilha sem alterações durante o benchmark
+        self.calls['revisions'] += 1
+        return '1'
+
+    def load_battle_replay(self, battle_url):
+        from util.showdown_battle import Battle, OperationResult
+
+        sleep(self.replay_latency)
+        self.calls['replays'] += 1
+        winner, loser, date = self.replays[battle_url]
+        return OperationResult(battle=Battle(winner, loser, date, 'gen8ou'))
+
+
+def configure_environment(url):
+    """
+    Aponta as configurações do bot para o servidor substituto.
+    Deve ser chamada antes de importar os módulos do bot.
+    """
+    os.environ.update({
+        'TOKEN': 'benchmark',
+        'ADMIN_CHANNEL': ADMIN_CHANNEL,
+        'GENERAL_CHANNEL': '0',
+        'BILL': url,
+        'BACKEND_URL': url,
+        'POKE_API_URL': f'{url}api/v2/pokemon/',
+        'ITEM_API_URL': f'{url}api/v2/item/',
+        'ABILITY_API_URL': f'{url}api/v2/ability/',
+    })
+    state_dir = tempfile.mkdtemp(prefix='oak-benchmark-')
+    os.environ.update({
+        'RANKED_VALIDATION_FILE': os.path.join(state_dir, 'ranked_validation.json'),
+        'RANKED_SNAPSHOT_FILE': os.path.join(state_dir, 'ranked_snapshot.json'),
+        'POKEAPI_CACHE_FILE': os.path.join(state_dir, 'pokeapi_cache.sqlite3'),
+        'POKEDEX_FILE': os.path.join(state_dir, 'pokedex.json'),
+    })
+
+
+def percentile(values, p):
+    """
+    Percentil pelo método nearest-rank.
+    """
+    ordered = sorted(values)
+    index = max(0, int(math.ceil(p / 100 * len(ordered))) - 1)
+    return ordered[index]
+
+
+def backend_calls(server, services):
+    """
+    Retorna os contadores de chamadas de cada serviço.
+    """
+    stats = Counter(server.stats)
+    calls = Counter({
+        'graphql': stats['bill:requests'],
+        'pokeapi': sum(v for k, v in stats.items() if k.startswith('pokeapi:')),
+    })
+    calls.update(services.calls)
+    return calls
+
+
+async def run_scenario(callback, args, make_context, iterations, concurrency, cold):
+    """
+    Executa um comando `iterations` vezes, com até `concurrency` execuções
+    simultâneas.
+
+    return : <tuple> : latências em segundos e erros ocorridos.
+    """
+    from util.bill_client import query_cache
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = []
+
+    async def run_once():
+        async with semaphore:
+            if cold:
+                query_cache.clear()
+            ctx = make_context()
+            start = perf_counter()
+            try:
+                await callback(ctx, *args)
+            except Exception as err:
+                errors.append(err)
+            latencies.append(perf_counter() - start)
+
+    await asyncio.gather(*[run_once() for _ in range(iterations)])
+    return latencies, errors
+
+
+async def run_benchmark(options, server, services):
+    # os módulos do bot leem as configurações na importação
+    import commands.bot_commands as bot_commands
+    import util.general_tools as general_tools
+    import util.ranked_validation as ranked_validation
+    from util.bill_client import bill_flight, bill_breaker, query_cache, micro_batcher
+    from util.get_api_data import pokeapi_cache
+    from util.pokeapi_client import pokeapi_client
+
+    general_tools._fetch_spreadsheet_ranges = services.fetch_spreadsheet_ranges
+    general_tools._fetch_spreadsheet_revision = services.fetch_spreadsheet_revision
+    ranked_validation.load_battle_replay = services.load_battle_replay
+
+    guild = build_guild(options.trainers, options.leaders)
+    names = sorted(command.name for command in bot_commands.client.commands)
+    if options.commands:
+        names = [name for name in names if name in options.commands]
+
+    results = []
+    for name in names:
+        if name in SKIP:
+            continue
+
+        callback = bot_commands.client.get_command(name).callback
+        for scenario in SCENARIOS.get(name, [()]):
+            args, author_id = scenario, 1
+            if scenario and isinstance(scenario[-1], int):
+                args, author_id = scenario[:-1], scenario[-1]
+
+            def make_context():
+                return FakeContext(guild, guild.by_id[author_id])
+
+            before = backend_calls(server, services)
+            latencies, errors = await run_scenario(
+                callback, args, make_context,
+                options.iterations, options.concurrency, options.cold
+            )
+            calls = backend_calls(server, services)
+            calls.subtract(before)
+
+            results.append({
+                'command': name,
+                'args': ' '.join(args),
+                'iterations': len(latencies),
+                'p50': percentile(latencies, 50) * 1000,
+                'p95': percentile(latencies, 95) * 1000,
+                'p99': percentile(latencies, 99) * 1000,
+                'errors': len(errors),
+                'error': repr(errors[0]) if errors else None,
+                'calls': {k: v / len(latencies) for k, v in calls.items() if v},
+            })
+
+    summary = {
+        'single_flight': bill_flight.stats(),
+        'cache': {'hits': query_cache.hits, 'misses': query_cache.misses},
+        'circuit_breaker': bill_breaker.stats(),
+        'ranked_snapshot': general_tools.ranked_snapshot.stats(),
+        'pokeapi_cache': {'hits': pokeapi_cache.hits, 'misses': pokeapi_cache.misses},
+        'pokeapi_client': pokeapi_client.stats(),
+    }
+    await pokeapi_client.close()
+    if micro_batcher is not None:
+        summary['micro_batcher'] = {
+            'requests': micro_batcher.requests,
+            'batched': micro_batcher.batched,
+        }
+
+    return results, summary
+
+
+def print_report(results, summary):
+    services = ['graphql', 'pokeapi', 'sheets', 'revisions', 'replays']
+    table = [
+        [
+            result['command'], result['args'], result['iterations'],
+            f'{result["p50"]:.1f}', f'{result["p95"]:.1f}', f'{result["p99"]:.1f}',
+            result['errors'],
+        ] + [f'{result["calls"].get(service, 0):.2f}' for service in services]
+        for result in results
+    ]
+    headers = ['comando', 'args', 'n', 'p50 ms', 'p95 ms', 'p99 ms', 'erros']
+    print(tabulate(table, headers=headers + [f'{s}/cmd' for s in services]))
+
+    print()
+    for key, value in summary.items():
+        print(f'{key}: {value}')
+
+    for result in results:
+        if result['error']:
+            print(f'{result["command"]} {result["args"]}: {result["error"]}')
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Benchmark dos comandos do bot')
+    arg_parser.add_argument('--iterations', type=int, default=20,
+                            help='execuções de cada cenário')
+    arg_parser.add_argument('--concurrency', type=int, default=1,
+                            help='execuções simultâneas de cada cenário')
+    arg_parser.add_argument('--latency', type=float, default=30,
+                            help='latência do Bill e da PokeAPI em ms')
+    arg_parser.add_argument('--jitter', type=float, default=10,
+                            help='variação da latência em ms')
+    arg_parser.add_argument('--sheets-latency', type=float, default=150,
+                            help='latência de cada leitura de planilha em ms')
+    arg_parser.add_argument('--replay-latency', type=float, default=100,
+                            help='latência de cada replay do Showdown em ms')
+    arg_parser.add_argument('--trainers', type=int, default=200)
+    arg_parser.add_argument('--leaders', type=int, default=30)
+    arg_parser.add_argument('--leagues', type=int, default=3)
+    arg_parser.add_argument('--rows', type=int, default=250,
+                            help='linhas das planilhas da ranked')
+    arg_parser.add_argument('--cold', action='store_true',
+                            help='limpa o cache do Bill antes de cada execução')
+    arg_parser.add_argument('--commands', nargs='*',
+                            help='executa somente os comandos informados')
+    arg_parser.add_argument('--output', help='salva os resultados em um arquivo json')
+    options = arg_parser.parse_args()
+
+    server = create_server(
+        latency=options.latency / 1000,
+        jitter=options.jitter / 1000,
+        trainers=options.trainers,
+        leaders=options.leaders,
+        leagues=options.leagues
+    )
+    server.start()
+    configure_environment(server.url)
+
+    services = FakeServices(
+        options.rows,
+        options.sheets_latency / 1000,
+        options.replay_latency / 1000
+    )
+
+    loop = asyncio.get_event_loop()
+    results, summary = loop.run_until_complete(run_benchmark(options, server, services))
+    server.shutdown()
+
+    print_report(results, summary)
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump({'results': results, 'summary': summary}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
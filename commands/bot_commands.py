@@ -7,10 +7,11 @@ facilitando a identificação e manutenção dos comandos.
 """
 # std libs
 from base64 import b64decode, b64encode
-from ast import literal_eval
 from sys import stdout
-from random import choice, randint
+from random import choice, randint, sample
 from datetime import datetime
+from functools import partial
+import asyncio
 import json
 import requests
 
@@ -19,36 +20,61 @@ from dateutil import parser
 
 # Discord tools
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 
 # settings constants
-from settings import (BACKEND_URL, SCORE_INDEX, ADMIN_CHANNEL, GENERAL_CHANNEL,
-                      COLOR_INDEX, ELO_IMG_INDEX, BILL_API_URL, __version__)
+from settings import (BACKEND_URL, ADMIN_CHANNEL, GENERAL_CHANNEL,
+                      COLOR_INDEX, ELO_IMG_INDEX, RANKED_REFRESH_INTERVAL,
+                      __version__)
 
 # general tools
-from util.showdown_battle import load_battle_replay
-from util.elos import get_elo, get_elo_name, validate_elo_battle, ELOS_MAP
+from util.elos import get_elo, get_elo_name, ELOS_MAP
+from util.ranked_validation import validate_form, validation_state
 
 # TODO talvez muitas destas funções pudessem ser encapsuladas em uma classe
 from util.general_tools import (get_trainer_rank, get_emoji,
                                 get_ranked_spreadsheet, get_form_spreadsheet,
                                 get_trainer_database_spreadsheet,
                                 get_trainer_db_table, get_random_profile,
-                                compare_insensitive, get_embed_output,
+                                get_embed_output,
                                 get_table_output, get_trainer_rank_row,
                                 get_initial_ranked_table, find_trainer,
                                 find_db_trainer, get_discord_member,
-                                get_value_or_default, get_gql_client,
-                                get_badge_icon)
+                                get_value_or_default, get_badge_icon,
+                                get_top_ranked_table, get_top_ranked_output,
+                                get_leaderboard, normalize_name,
+                                ranked_snapshot)
 
 # requests tools
-from util.get_api_data import (dex_information, get_pokemon_data)
+from util.get_api_data import (dex_information, async_get_pokemon_data)
+from util.pokeapi_client import pokeapi_client
 from util.oak_errors import CommandErrors
+from util.bill_client import (get_client, close_clients, async_execute,
+                              async_execute_many, get_page, build_page,
+                              offset_cursor, get_error_message)
 from commands.queries import Query
 from commands.mutations import Mutations
 
 
-client = commands.Bot(command_prefix='/')
+class OakBot(commands.Bot):
+    """
+    Bot do Oak. Ao ser encerrado, fecha também as conexões mantidas abertas
+    com o Bill e com a PokeAPI.
+    """
+
+    async def close(self):
+        await super().close()
+        close_clients()
+        await pokeapi_client.close()
+
+
+client = OakBot(command_prefix='/')
+
+# itens por página nas listagens do Bill (um embed aceita no máximo 25 campos)
+TRAINERS_PAGE_SIZE = 8
+LEADERS_PAGE_SIZE = 6
+SCORES_PAGE_SIZE = 20
+ELO_PAGE_SIZE = 20
 
 
 @client.event
@@ -87,6 +113,15 @@ async def on_ready():
     Imprime uma mensagem no console informando que o bot, a princípio executou
     corretamente.
     """
+    # inicializa o client compartilhado do Bill
+    get_client()
+
+    # on_ready é chamado novamente a cada reconexão
+    if refresh_ranked.get_task() is None:
+        # responde com a última cópia salva até a primeira atualização
+        ranked_snapshot.warm_start()
+        refresh_ranked.start()
+
     print("The bot is ready!")
 
 @client.command()
@@ -142,7 +177,7 @@ async def random_pokemon(ctx):
         pokes = f.readlines()
 
     i_choose_you = choice(pokes).split('\n')[0]
-    poke = get_pokemon_data(i_choose_you.lower())
+    poke = await async_get_pokemon_data(i_choose_you.lower())
     response = dex_information(poke)
     await ctx.send(response)
 
@@ -151,14 +186,38 @@ async def random_pokemon(ctx):
 # Comandos Ranked
 ##########################################
 
+async def get_ranked_data(ctx):
+    """
+    Retorna os dados atuais da ranked. Caso não seja possível obtê-los,
+    responde com uma mensagem de erro e retorna None.
+    """
+    try:
+        return await ranked_snapshot.async_get()
+    except Exception as err:
+        stdout.write(f'Erro: {str(err)}\n\n')
+        await ctx.send(
+            'Desculpe não pude realizar esta operação. tente novamente mais tarde!'
+        )
+        return None
+
+
+@tasks.loop(seconds=RANKED_REFRESH_INTERVAL)
+async def refresh_ranked():
+    """
+    Atualiza periodicamente a cópia em memória da planilha da Ranked, fora
+    do event loop.
+    """
+    try:
+        await ranked_snapshot.async_refresh()
+    except Exception as err:
+        stdout.write(f'Erro: {str(err)}\n\n')
+
+
 @client.command(aliases=['top', 'rt', 'ranked_top'])
 async def top_ranked(ctx, *args):
     """
     Informa os 20 primeiros colocados da Ranked ABP.
     """
-    data = get_ranked_spreadsheet()
-    table = get_initial_ranked_table()
-
     view_types = [
         ["list", "lista", "elos"],
         ["table", "tabela"]
@@ -166,18 +225,16 @@ async def top_ranked(ctx, *args):
     is_table = len(args) > 0 and args[0].strip().lower() in view_types[1]
     is_list = not is_table
 
-    for i, trainer in enumerate(data[:20], start=1):
-        trainer = get_trainer_rank_row(trainer, i)
-        table.append(trainer)
+    if await get_ranked_data(ctx) is None:
+        return
 
     if is_list:
         descript = "**__Top Players__**"
-        output = get_embed_output(table, client)
+        output = get_embed_output(get_top_ranked_table(), client)
         await ctx.send(descript, embed=output)
 
     else:
-        output = get_table_output(table)
-        await ctx.send(output)
+        await ctx.send(get_top_ranked_output())
 
 
 @client.command(aliases=['trainer', 'trainer_ranked'])
@@ -189,6 +246,9 @@ async def ranked_trainer(ctx, *trainer_nickname):
         await ctx.send('Forneça um nick\nUso: `/ranked_trainer <nickname>`')
 
     else:
+        if await get_ranked_data(ctx) is None:
+            return
+
         trainer_nickname = ' '.join(word for word in trainer_nickname)
         trainer = find_trainer(trainer_nickname)
 
@@ -197,8 +257,8 @@ async def ranked_trainer(ctx, *trainer_nickname):
 
         else:
             # lookup for the trainer elo data
-            nick = "**__" + trainer[1] + "__**"
-            elo_rank = get_trainer_rank(trainer[SCORE_INDEX])
+            nick = "**__" + trainer.nick + "__**"
+            elo_rank = get_trainer_rank(trainer.points)
             elo = get_elo_name(elo_rank)
             elo_data = [item for item in ELOS_MAP if item[0] == elo][0]
 
@@ -206,12 +266,12 @@ async def ranked_trainer(ctx, *trainer_nickname):
             embed = discord.Embed(color=elo_data[COLOR_INDEX], type="rich")
             embed.set_thumbnail(url=elo_data[ELO_IMG_INDEX])
 
-            embed.add_field(name="Pos", value=trainer[6], inline=True)
+            embed.add_field(name="Pos", value=trainer.pos, inline=True)
             embed.add_field(name="Elo", value=elo_rank, inline=True)
-            embed.add_field(name="Wins", value=trainer[2], inline=True)
-            embed.add_field(name="Losses", value=trainer[3], inline=True)
-            embed.add_field(name="Battles", value=trainer[5], inline=True)
-            embed.add_field(name="Points", value=trainer[4], inline=True)
+            embed.add_field(name="Wins", value=trainer.wins, inline=True)
+            embed.add_field(name="Losses", value=trainer.losses, inline=True)
+            embed.add_field(name="Battles", value=trainer.battles, inline=True)
+            embed.add_field(name="Points", value=trainer.points, inline=True)
 
             await ctx.send(nick, embed=embed)
 
@@ -219,45 +279,72 @@ async def ranked_trainer(ctx, *trainer_nickname):
 @client.command(aliases=['elo', 'elo_ranked'])
 async def ranked_elo(ctx, *elo_arg):
     """
-    Retorna todos os treinadores que estão no Rank Elo solicitado.
+    Retorna todos os treinadores que estão no Rank Elo solicitado, de 20 em
+    20. Um número ao final seleciona a página da listagem:
+        /ranked_elo ouro 2
     """
     if not elo_arg:
-        await ctx.send('Forneça um Rank Elo\nUso: `/ranked_elo <elo>`')
+        await ctx.send('Forneça um Rank Elo\nUso: `/ranked_elo <elo> [página]`')
 
     else:
+        page = 1
+        if len(elo_arg) > 1 and elo_arg[-1].isdigit():
+            page = int(elo_arg[-1])
+            elo_arg = elo_arg[:-1]
+            if page < 1:
+                return await ctx.send('Página inválida!')
+
+        if await get_ranked_data(ctx) is None:
+            return
+
         elo = ' '.join(word for word in elo_arg)
-        data = get_ranked_spreadsheet()
+        leaderboard = get_leaderboard()
         table = get_initial_ranked_table()
 
-        for i, trainer in enumerate(data, start=1):
-            rank = get_trainer_rank(trainer[SCORE_INDEX])
-            is_target_elo = compare_insensitive(rank, elo)
-            if is_target_elo:
-                trainer = get_trainer_rank_row(trainer, i)
-                table.append(trainer)
+        try:
+            elo_key = get_elo(normalize_name(elo))
+        except KeyError:
+            entries, pages = [], 0
+        else:
+            entries = leaderboard.elo_page(elo_key, page, ELO_PAGE_SIZE)
+            pages = leaderboard.elo_pages(elo_key, ELO_PAGE_SIZE)
+
+        for trainer in entries:
+            table.append(get_trainer_rank_row(trainer))
 
         # only table header
         if len(table) == 1:
             await ctx.send('Treinadores não encontrados para o Elo: ' + elo)
 
-        # when too big table, shows just the first 20
-        elif len(table) > 20:
-            table = table[:21]
-            await ctx.send('Top 20 treinadores do Elo: ' + elo)
+        else:
+            if pages > 1:
+                await ctx.send(f'Treinadores do Elo: {elo} (página {page}/{pages})')
 
             output = get_table_output(table)
             await ctx.send(output)
 
 
 @client.command(aliases=['valid', 'rv'])
-async def ranked_validate(ctx):
+async def ranked_validate(ctx, *args):
     """
-    Valida pendências do formulário de batalhas
+    Valida pendências do formulário de batalhas. Somente as batalhas novas
+    ou editadas desde a última validação são verificadas; use
+    `/ranked_validate all` para validar o formulário inteiro novamente.
     """
     if ctx.message.channel.name == ADMIN_CHANNEL:
 
-        data = get_form_spreadsheet()
-        ranked_data = get_ranked_spreadsheet()
+        if 'all' in args:
+            validation_state.reset()
+
+        # formulário e ranked lidos juntos, do mesmo momento
+        try:
+            sheets = await ranked_snapshot.async_refresh()
+        except Exception as err:
+            stdout.write(f'Erro: {str(err)}\n\n')
+            return await ctx.send('Não foi possível ler os dados da Ranked!')
+
+        data = get_form_spreadsheet(sheets)
+        ranked_data = get_ranked_spreadsheet(sheets)
         errors = [
             ["Ln.", "Error"]
         ]
@@ -270,46 +357,13 @@ async def ranked_validate(ctx):
             'https://media.giphy.com/media/111ebonMs90YLu/giphy.gif'
         ]
 
-        for i, row in enumerate(data, start=2):
-            # validate trainers
-            trainers_result = ""
-            winner_data = find_trainer(row[2], ranked_data)
-            loser_data = find_trainer(row[3], ranked_data)
-
-            if not winner_data:
-                trainers_result += "Winner not found; "
-
-            if not loser_data:
-                trainers_result += "Loser not found; "
-
-            if trainers_result:
-                errors.append([i, trainers_result])
-
-            # validate elos
-            winner_elo = get_elo(get_trainer_rank(winner_data[SCORE_INDEX]))
-            loser_elo = get_elo(get_trainer_rank(loser_data[SCORE_INDEX]))
-            valid_elos = validate_elo_battle(winner_elo, loser_elo)
-
-            if not valid_elos:
-                error = f"Invalid elos matchup \
-                    ({winner_elo.name} vs {loser_elo.name})"
-                errors.append([i, error])
-
-            # validate showdown replay
-            result = load_battle_replay(row[4])  # 4 is the replay
-
-            if not result.success:
-                errors.append([i, "Não foi possivel carregar o replay"])
-
-            # validate replay metadata
-            battle_result = result.battle.validate(
-                row[2],
-                row[3],
-                datetime.strptime(row[0], "%d/%m/%Y %H:%M:%S")
-            )
-
-            if not battle_result.success:
-                errors.append([i, battle_result.error])
+        # os replays são baixados fora do event loop
+        loop = asyncio.get_event_loop()
+        pending, validated = await loop.run_in_executor(
+            None, validate_form, data, ranked_data
+        )
+        errors.extend(pending)
+        await ctx.send(f'{validated} batalha(s) nova(s) ou editada(s) validada(s).')
 
         # only table header
         if len(errors) == 1:
@@ -325,11 +379,32 @@ async def ranked_validate(ctx):
         await ctx.send("Comando restrito!")
 
 
+@client.command(aliases=['refresh', 'rr'])
+async def ranked_refresh(ctx):
+    """
+    Atualiza imediatamente os dados da Ranked, sem aguardar a atualização
+    periódica.
+    """
+    if ctx.message.channel.name != ADMIN_CHANNEL:
+        return await ctx.send("Comando restrito!")
+
+    try:
+        data = await ranked_snapshot.async_refresh()
+    except Exception as err:
+        stdout.write(f'Erro: {str(err)}\n\n')
+        return await ctx.send('Não foi possível atualizar os dados da Ranked!')
+
+    await ctx.send(f'Ranked atualizada! {len(get_ranked_spreadsheet(data))} treinadores.')
+
+
 @client.command(aliases=['db', 'bd', 'abp-db', 'trainer_db', 'trainer_names'])
 async def abp_db(ctx, *trainer_arg):
     """
     Treinadores cadastrados no sistema 1.0 da ABP.
     """
+    if await get_ranked_data(ctx) is None:
+        return
+
     if trainer_arg:
         trainer_nickname = ' '.join(word for word in trainer_arg)
         trainer = find_db_trainer(trainer_nickname)
@@ -338,8 +413,8 @@ async def abp_db(ctx, *trainer_arg):
             return await ctx.send('Treinador não encontrado')
 
         # lookup for the trainer as discord member
-        nick = "**__" + trainer[0] + "__**"
-        trainer_discord = get_discord_member(client, trainer[1])
+        nick = "**__" + trainer.nick + "__**"
+        trainer_discord = get_discord_member(client, trainer.discord)
 
         rnd_profile = get_random_profile()
         color = (trainer_discord.color) if trainer_discord is not None else rnd_profile[0]
@@ -349,9 +424,9 @@ async def abp_db(ctx, *trainer_arg):
         embed = discord.Embed(color=color, type="rich")
         embed.set_thumbnail(url=avatar)
 
-        embed.add_field(name="Discord", value=get_value_or_default(trainer, 1), inline=False)
-        embed.add_field(name="Switch FC", value=get_value_or_default(trainer, 2), inline=False)
-        embed.add_field(name="Showdown", value=get_value_or_default(trainer, 3), inline=False)
+        embed.add_field(name="Discord", value=get_value_or_default(trainer.discord), inline=False)
+        embed.add_field(name="Switch FC", value=get_value_or_default(trainer.switch_fc), inline=False)
+        embed.add_field(name="Showdown", value=get_value_or_default(trainer.showdown), inline=False)
 
         await ctx.send(nick, embed=embed)
 
@@ -361,10 +436,7 @@ async def abp_db(ctx, *trainer_arg):
         table = get_trainer_db_table()
 
         if len(data) > max_data:
-            for _ in range(1, max_data):
-                pos = randint(0, len(data)-1)
-                table.append(data[pos])
-                del data[pos]
+            table.extend(sample(data, max_data - 1))
         else:
             table.extend(data)
 
@@ -377,9 +449,9 @@ async def abp_db(ctx, *trainer_arg):
         embed.set_thumbnail(url="http://bit.ly/abp_logo")
 
         for _, trainer in enumerate(table[1:max_data+1], start=1):
-            title = "{0} - {1}".format(trainer[0], get_value_or_default(trainer, 1, "n/a"))
-            details = "FC: `{0}` | SD: `{1}`".format(get_value_or_default(trainer, 2),
-                                                     get_value_or_default(trainer, 3))
+            title = "{0} - {1}".format(trainer.nick, get_value_or_default(trainer.discord, default_value="n/a"))
+            details = "FC: `{0}` | SD: `{1}`".format(get_value_or_default(trainer.switch_fc),
+                                                     get_value_or_default(trainer.showdown))
 
             embed.add_field(name=title, value=details, inline=False)
 
@@ -411,9 +483,14 @@ async def view_leagues(bot, league_id=None):
     """
     # busca todas as ligas
     if not league_id:
-        payload = Query.get_leagues()
-        client = get_gql_client(BILL_API_URL)
-        response = client.execute(payload)
+        payload = Query.get_leagues(projection='summary')
+        try:
+            response = await async_execute(payload)
+        except Exception as err:
+            stdout.write(f'Erro: {str(err)}\n\n')
+            return await bot.send(
+                'Desculpe não pude realizar esta operação. tente novamente mais tarde!'
+            )
 
         leagues = [edge.get('node') for edge in response['leagues'].get('edges')]
 
@@ -447,9 +524,14 @@ async def view_leagues(bot, league_id=None):
         return await bot.send('ID inválido!')  # TODO retornar Oak error
 
     league_hash = b64encode(f'LeagueType:{int_id}'.encode('utf-8')).decode('utf-8')
-    payload = Query.get_leagues(id=league_hash)
-    client = get_gql_client(BILL_API_URL)
-    response = client.execute(payload)
+    payload = Query.get_leagues(id=league_hash, projection='detail')
+    try:
+        response = await async_execute(payload)
+    except Exception as err:
+        stdout.write(f'Erro: {str(err)}\n\n')
+        return await bot.send(
+            'Desculpe não pude realizar esta operação. tente novamente mais tarde!'
+        )
 
     leagues = response['leagues']['edges']
     if not leagues:
@@ -485,6 +567,9 @@ async def view_trainers(bot, discord_id=None):
     Exemplo de uso, ver listagem de treinadores:
         /view_trainers
 
+    Exemplo de uso, ver a página 2 da listagem:
+        /view_trainers 2
+
     Exemplo de uso, ver dados de um treinador:
         /view_trainers @Username
 
@@ -495,14 +580,23 @@ async def view_trainers(bot, discord_id=None):
     """
     embed = discord.Embed(color=0x1E1E1E, type="rich")
 
-    if not discord_id:
-        payload = Query.get_trainers()
-        client = get_gql_client(BILL_API_URL)
-        response = client.execute(payload)
-
-        trainers = [edge.get('node') for edge in response['trainers'].get('edges')]
+    # um número no lugar do ID discord seleciona a página da listagem
+    if not discord_id or discord_id.isdigit():
+        page = int(discord_id or 1)
+        if page < 1:
+            return await bot.send('Página inválida!')
+        query = partial(Query.get_trainers, projection='summary')
+        try:
+            result = await get_page(query, 'trainers', page, TRAINERS_PAGE_SIZE)
+        except Exception as err:
+            stdout.write(f'Erro: {str(err)}\n\n')
+            return await bot.send(
+                'Desculpe não pude realizar esta operação. tente novamente mais tarde!'
+            )
+        if not result.nodes:
+            return await bot.send('Nenhum treinador nesta página!')
 
-        for trainer in trainers:
+        for trainer in result.nodes:
             discord_id = trainer.get('discordId', '?')
             battle_counter = trainer.get('battleCounter', '?')
             lv = trainer.get('lv', '?')
@@ -511,6 +605,9 @@ async def view_trainers(bot, discord_id=None):
             embed.add_field(name="Lv", value=lv, inline=True)
             embed.add_field(name="Batalhas", value=battle_counter, inline=True)
 
+        if result.has_next:
+            embed.set_footer(text=f'Página {page} - próxima: /vt {page + 1}')
+
         description = 'Treinadores ABP'
         embed.set_thumbnail(url="http://bit.ly/abp_logo")
         return await bot.send(description, embed=embed)
@@ -526,8 +623,13 @@ async def view_trainers(bot, discord_id=None):
         return await bot.send('Treinador inválido!')  # TODO Retornar Oak Error
 
     payload = Query.get_trainers(id=discord_id)
-    client = get_gql_client(BILL_API_URL)
-    response = client.execute(payload)
+    try:
+        response = await async_execute(payload)
+    except Exception as err:
+        stdout.write(f'Erro: {str(err)}\n\n')
+        return await bot.send(
+            'Desculpe não pude realizar esta operação. tente novamente mais tarde!'
+        )
 
     trainers = [edge.get('node') for edge in response['trainers'].get('edges')]
     if not trainers:
@@ -574,6 +676,9 @@ async def view_leaders(bot, discord_id=None):
     Exemplo de uso, ver lista de líderes:
         /view_leaders
 
+    Exemplo de uso, ver a página 2 da lista de líderes:
+        /view_leaders 2
+
     Exemplo de uso, ver dados de um líder:
         /view_leaders @Username
 
@@ -586,14 +691,23 @@ async def view_leaders(bot, discord_id=None):
     """
     embed = discord.Embed(color=0x1E1E1E, type="rich")
 
-    if not discord_id:
-        payload = Query.get_leaders()
-        client = get_gql_client(BILL_API_URL)
-        response = client.execute(payload)
-
-        leaders = [edge.get('node') for edge in response['leaders'].get('edges')]
+    # um número no lugar do ID discord seleciona a página da listagem
+    if not discord_id or discord_id.isdigit():
+        page = int(discord_id or 1)
+        if page < 1:
+            return await bot.send('Página inválida!')
+        query = partial(Query.get_leaders, projection='summary')
+        try:
+            result = await get_page(query, 'leaders', page, LEADERS_PAGE_SIZE)
+        except Exception as err:
+            stdout.write(f'Erro: {str(err)}\n\n')
+            return await bot.send(
+                'Desculpe não pude realizar esta operação. tente novamente mais tarde!'
+            )
+        if not result.nodes:
+            return await bot.send('Nenhum líder nesta página!')
 
-        for leader in leaders:
+        for leader in result.nodes:
             discord_id = leader.get('discordId', '?')
             lv = leader.get('lv', '?')
             fc = leader.get('fc', '?')
@@ -604,6 +718,9 @@ async def view_leaders(bot, discord_id=None):
             embed.add_field(name="FC", value=fc, inline=True)
             embed.add_field(name="Tipo", value=pkm_type, inline=True)
 
+        if result.has_next:
+            embed.set_footer(text=f'Página {page} - próxima: /vl {page + 1}')
+
         description = 'Líderes ABP'
         embed.set_thumbnail(url="http://bit.ly/abp_logo")
         return await bot.send(description, embed=embed)
@@ -620,8 +737,13 @@ async def view_leaders(bot, discord_id=None):
         return await bot.send('Treinador inválido!')  # TODO Retornar Oak Error
 
     payload = Query.get_leaders(id=discord_id)
-    client = get_gql_client(BILL_API_URL)
-    response = client.execute(payload)
+    try:
+        response = await async_execute(payload)
+    except Exception as err:
+        stdout.write(f'Erro: {str(err)}\n\n')
+        return await bot.send(
+            'Desculpe não pude realizar esta operação. tente novamente mais tarde!'
+        )
 
     leaders = [edge.get('node') for edge in response['leaders'].get('edges')]
     if not leaders:
@@ -703,14 +825,12 @@ async def new_trainer(bot, discord_id=None):
         return await bot.send('Treinador inválido!')  # TODO Retornar Oak Error
 
     payload = Mutations.create_trainer(discord_id)
-    client = get_gql_client(BILL_API_URL)
-
     try:
-        response = client.execute(payload)
+        response = await async_execute(payload)
     except Exception as err:
         stdout.write(f'Erro: {str(err)}\n\n')
 
-        is_unique = literal_eval(err.args[0]).get('message').startswith('UNIQUE')
+        is_unique = get_error_message(err).startswith('UNIQUE')
         if is_unique:
             return await bot.send('Este treinador já está registrado!')
         return await bot.send(
@@ -780,14 +900,12 @@ async def new_league(bot, *reference):
     reference = ' '.join(word for word in reference)
 
     payload = Mutations.create_league(reference)
-    client = get_gql_client(BILL_API_URL)
-
     try:
-        response = client.execute(payload)
+        response = await async_execute(payload)
     except Exception as err:
         stdout.write(f'Erro: {str(err)}\n\n')
 
-        is_unique = literal_eval(err.args[0]).get('message').startswith('UNIQUE')
+        is_unique = get_error_message(err).startswith('UNIQUE')
         if is_unique:
             return await bot.send('Esta liga já está registrada!')
         return await bot.send(
@@ -894,14 +1012,12 @@ async def new_leader(bot, *args):
         poke_type.upper(),
         role.upper()
     )
-    client = get_gql_client(BILL_API_URL)
-
     try:
-        response = client.execute(payload)
+        response = await async_execute(payload)
     except Exception as err:
         stdout.write(f'Erro: {str(err)}\n\n')
 
-        is_unique = literal_eval(err.args[0]).get('message').startswith('UNIQUE')
+        is_unique = get_error_message(err).startswith('UNIQUE')
         if is_unique:
             return await bot.send('Este líder já está registrado!')
         return await bot.send(
@@ -1004,13 +1120,11 @@ async def league_register(bot, *args):
         return await bot.send('Aceito somente as opções `-t` e `-l`')
 
     payload = Mutations.league_registration(discord_id, league, options[option])
-    client = get_gql_client(BILL_API_URL)
-
     try:
-        response = client.execute(payload)
+        response = await async_execute(payload)
     except Exception as err:
         stdout.write(f'Erro: {str(err)}\n\n')
-        error_message = literal_eval(err.args[0]).get('message')
+        error_message = get_error_message(err)
         is_unique = 'already registered' in error_message
         if is_unique:
             return await bot.send('Este usuário já foi registrado!')
@@ -1078,14 +1192,12 @@ async def battle_register(bot, *args):
     league = b64encode(f'LeagueType:{int_id}'.encode('utf-8')).decode('utf-8')
 
     payload = Mutations.battle_registration(league, trainer, leader, winner)
-    client = get_gql_client(BILL_API_URL)
-
     try:
-        response = client.execute(payload)
+        response = await async_execute(payload)
     except Exception as err:
         stdout.write(f'Erro: {str(err)}\n\n')
 
-        err_message = literal_eval(err.args[0]).get('message')
+        err_message = get_error_message(err)
         if 'trainer is in standby' in err_message:
             return await bot.send(
                 'Este treinador está de molho e não pode batalhar!'
@@ -1193,13 +1305,11 @@ async def add_badge(bot, discord_id=None, badge=None, league=None):
     league = b64encode(f'LeagueType:{int_id}'.encode('utf-8')).decode('utf-8')
 
     payload = Mutations.add_badge(discord_id, badge, league)
-    client = get_gql_client(BILL_API_URL)
-
     try:
-        response = client.execute(payload)
+        response = await async_execute(payload)
     except Exception as err:
         stdout.write(f'Erro: {str(err)}\n\n')
-        error_message = literal_eval(err.args[0]).get('message')
+        error_message = get_error_message(err)
 
         if error_message == 'This trainer already have this badge!':
             return await bot.send('Esse treinador ja possui esta insígnia!')
@@ -1277,10 +1387,8 @@ async def update_trainer(bot, discord_id=None, *tokens):
             inputs[valid_options[pair[0].lower()]] = pair[1]
 
     payload = Mutations.update_trainer(discord_id, **inputs)
-    client = get_gql_client(BILL_API_URL)
-
     try:
-        response = client.execute(payload)
+        response = await async_execute(payload)
     except Exception as err:
         stdout.write(f'Erro: {str(err)}\n\n')
         return # TODO retornar Oak error
@@ -1360,10 +1468,8 @@ async def update_leader(bot, discord_id=None, *tokens):
             inputs[valid_options[pair[0].lower()]] = pair[1]
 
     payload = Mutations.update_leader(discord_id, **inputs)
-    client = get_gql_client(BILL_API_URL)
-
     try:
-        response = client.execute(payload)
+        response = await async_execute(payload)
     except Exception as err:
         stdout.write(f'Erro: {str(err)}\n\n')
         return await bot.send('Desculpe não pude realizar esta operação!')
@@ -1459,10 +1565,8 @@ async def update_league(bot, league_id=None, *tokens):
                 inputs[valid_options[pair[0].lower()]] = pair[1]
 
     payload = Mutations.update_league(league_id, **inputs)
-    client = get_gql_client(BILL_API_URL)
-
     try:
-        response = client.execute(payload)
+        response = await async_execute(payload)
     except Exception as err:
         stdout.write(f'Erro: {str(err)}\n\n')
         return await bot.send('Desculpe não pude realizar esta operação!')
@@ -1481,63 +1585,97 @@ async def update_league(bot, league_id=None, *tokens):
 
 
 @client.command(aliases=['sc', 'lscores', 'resumo_placar', 'rp'])
-async def scores(bot, league_id=None):
+async def scores(bot, *args):
     """
     Consulta o resumo dos scores de uma liga
 
     Exmplo de uso:
         /scores liga1
 
+    Para consultar várias ligas de uma vez:
+        /scores liga1 liga2
+
+    Para ver outra página dos scores, informe o número da página:
+        /scores liga1 2
+
     Aliases:
         sc
         lscores
         resumo_placar
         rp
     """
-    if not league_id:
+    # um número ao final seleciona a página
+    page = 1
+    if args and args[-1].isdigit():
+        page = int(args[-1])
+        args = args[:-1]
+        if page < 1:
+            return await bot.send('Página inválida!')
+
+    league_ids = args
+    if not league_ids:
         return await bot.send(
             'É preciso informar o id de uma liga!\nEx:\n`/scores liga1`'
         )  # TODO retornar Oak error
 
-    embed = discord.Embed(color=0x1E1E1E, type="rich")
-    embed.set_thumbnail(url="http://bit.ly/abp_logo")
+    league_hashes = []
+    for league_id in league_ids:
+        # faz a hash da liga
+        try:
+            _, int_id = league_id.lower().split('liga')
+        except Exception:
+            return await bot.send('ID inválido!')  # TODO retornar Oak error
 
-    # faz a hash da liga
-    try:
-        _, int_id = league_id.lower().split('liga')
-    except Exception:
-        return await bot.send('ID inválido!')  # TODO retornar Oak error
+        # Garante que o id é realmente integer
+        if not int_id.isdigit():
+            return await bot.send('ID inválido!')  # TODO retornar Oak error
 
-    # Garante que o id é realmente integer
-    if not int_id.isdigit():
-        return await bot.send('ID inválido!')  # TODO retornar Oak error
+        league_hashes.append(
+            b64encode(f'LeagueType:{int_id}'.encode('utf-8')).decode('utf-8')
+        )
 
-    league_hash = b64encode(f'LeagueType:{int_id}'.encode('utf-8')).decode('utf-8')
+    # a página solicitada de todas as ligas é consultada em uma única requisição
+    after = offset_cursor((page - 1) * SCORES_PAGE_SIZE - 1)
+    try:
+        responses = await async_execute_many([
+            Query.get_scores(league_hash, first=SCORES_PAGE_SIZE, after=after)
+            for league_hash in league_hashes
+        ])
+        results = [build_page(page, response['scores']) for response in responses]
+    except Exception as err:
+        stdout.write(f'Erro: {str(err)}\n\n')
+        return await bot.send(
+            'Desculpe não pude realizar esta operação. tente novamente mais tarde!'
+        )
 
-    payload = Query.get_scores(league_id=league_hash)
-    client = get_gql_client(BILL_API_URL)
-    response = client.execute(payload)
+    for league_id, result in zip(league_ids, results):
+        if not result.nodes:
+            await bot.send('Não há scores nesta liga ainda!')  # TODO retornar Oak error
+            continue
 
-    scores = response['scores']['edges']
-    if not scores:
-        return await bot.send('Não há scores nesta liga ainda!')  # TODO retornar Oak error
+        embed = discord.Embed(color=0x1E1E1E, type="rich")
+        embed.set_thumbnail(url="http://bit.ly/abp_logo")
 
-    for score in scores:
-        trainer = score['node']['trainer'].get('discordId', '?')
-        lv = score['node']['trainer'].get('lv', '?')
-        wins = score['node'].get('wins', '?')
-        losses = score['node'].get('losses', '?')
-        badges = score['node'].get('badges', '0')
-        standby = score['node'].get('standby')
-        standby = ':exclamation:' if standby else ':white_check_mark:'
+        for score in result.nodes:
+            trainer = score['trainer'].get('discordId', '?')
+            lv = score['trainer'].get('lv', '?')
+            wins = score.get('wins', '?')
+            losses = score.get('losses', '?')
+            badges = score.get('badges', '0')
+            standby = score.get('standby')
+            standby = ':exclamation:' if standby else ':white_check_mark:'
 
-        body = f'{trainer} | **Lv**: `{lv}` | **Win**: `{wins}` | '\
-               f'**Lose**: `{losses}` | **Insígnias**: `{len(badges)}` | '\
-               f'**Molho**: {standby}'
+            body = f'{trainer} | **Lv**: `{lv}` | **Win**: `{wins}` | '\
+                   f'**Lose**: `{losses}` | **Insígnias**: `{len(badges)}` | '\
+                   f'**Molho**: {standby}'
 
-        embed.add_field(name='Treinador', value=body, inline=False)
+            embed.add_field(name='Treinador', value=body, inline=False)
+
+        if result.has_next:
+            embed.set_footer(text=f'Página {page} - próxima: /sc {league_id} {page + 1}')
 
-    return await bot.send('Scores', embed=embed)
+        title = 'Scores' if len(league_ids) == 1 else f'Scores da {league_id}'
+        await bot.send(title, embed=embed)
 
 
 @client.command(aliases=['tscore', 'ts', 'placar'])
@@ -1582,10 +1720,8 @@ async def trainer_score(bot, discord_id=None, league=None):
     league_id = b64encode(f'LeagueType:{int_id}'.encode('utf-8')).decode('utf-8')
 
     payload = Query.get_trainer_score(discord_id, league_id)
-    client = get_gql_client(BILL_API_URL)
-
     try:
-        response = client.execute(payload)
+        response = await async_execute(payload)
     except Exception as err:
         stdout.write(f'Erro: {str(err)}\n\n')
         return # TODO retornar Oak error
@@ -1663,12 +1799,13 @@ async def standby_trainers(bot, league_id=None):
 
     league_hash = b64encode(f'LeagueType:{int_id}'.encode('utf-8')).decode('utf-8')
     payload = Query.get_standby_trainers(league_hash)
-    client = get_gql_client(BILL_API_URL)
-
     try:
-        response = client.execute(payload)
+        response = await async_execute(payload)
     except Exception as err:
         stdout.write(f'Erro: {str(err)}\n\n')
+        return await bot.send(
+            'Desculpe não pude realizar esta operação. tente novamente mais tarde!'
+        )
 
     scores = response['scores']['edges']
     if not scores:
@@ -1699,10 +1836,8 @@ async def version(bot):
     Retorna a versão dos componentes do sistema ABP
     """
     payload = Query.get_version()
-    client = get_gql_client(BILL_API_URL)
-
     try:
-        response = client.execute(payload)
+        response = await async_execute(payload)
     except Exception as err:
         stdout.write(f'Erro: {str(err)}\n\n')
         return await bot.send(
@@ -1,7 +1,136 @@
 """
 Modulo para requisições de mutation para a API.
+
+Os documentos são interpretados uma única vez, na importação do módulo, e os
+dados de cada mutation são enviados na variável graphql `input`.
 """
-from gql import gql
+from util.bill_client import Operation, parse_document
+
+
+CREATE_TRAINER = parse_document('''
+mutation createTrainer($input: CreateTrainerInput!) {
+  createTrainer(input: $input){
+    trainer{
+      id
+      discordId
+      name
+      joinDate
+      battleCounter
+      badgeCounter
+      leaguesCounter
+      winPercentage
+      loosePercentage
+      lv
+      exp
+      nextLv
+    }
+  }
+}
+''')
+
+CREATE_LEAGUE = parse_document('''
+mutation createLeague($input: CreateLeagueInput!) {
+  createLeague(input: $input){
+    league{
+      id
+      reference
+      startDate
+      endDate
+    }
+  }
+}
+''')
+
+CREATE_LEADER = parse_document('''
+mutation createLeader($input: CreateLeaderInput!) {
+  createLeader(input: $input){
+    leader{
+      id
+      name
+      role
+      pokemonType
+      joinDate
+      battleCounter
+      winPercentage
+      loosePercentage
+      discordId
+      lv
+      nextLv
+      exp
+    }
+  }
+}
+''')
+
+LEAGUE_REGISTRATION = parse_document('''
+mutation leagueRegistration($input: LeagueRegistrationInput!) {
+  leagueRegistration(input: $input){
+    registration
+  }
+}
+''')
+
+BATTLE_REGISTER = parse_document('''
+mutation battleRegister($input: BattleRegisterInput!) {
+  battleRegister(input: $input){
+    battle{
+      id
+      battleDatetime
+      winner
+    }
+  }
+}
+''')
+
+ADD_BADGE = parse_document('''
+mutation addBadgeToTrainer($input: AddBadgeToTrainerInput!) {
+  addBadgeToTrainer(input: $input){
+    response
+  }
+}
+''')
+
+UPDATE_TRAINER = parse_document('''
+mutation update_trainer($input: UpdateTrainerInput!) {
+  updateTrainer(input: $input) {
+    trainer{
+      name
+      sdId
+      fc
+      discordId
+    }
+  }
+}
+''')
+
+UPDATE_LEADER = parse_document('''
+mutation updateLeader($input: UpdateLeaderInput!) {
+  updateLeader(input: $input){
+    leader{
+      name
+      role
+      pokemonType
+      clauses
+      fc
+      sdId
+      discordId
+    }
+  }
+}
+''')
+
+UPDATE_LEAGUE = parse_document('''
+mutation update_league($input: UpdateLeagueInput!) {
+  updateLeague(input: $input){
+    league{
+      reference
+      startDate
+      endDate
+    }
+  }
+}
+''')
+
 
 class Mutations:
 
@@ -10,128 +139,87 @@ class Mutations:
       """
       Envia uma requisição para a API solicitando a criação de um treinador.
       """
-      mutation = f'''
-      mutation{{
-        createTrainer(input:{{
-          discordId: "{discord_id}"
-        }}){{
-          trainer{{
-            id
-            discordId
-            name
-            joinDate
-            battleCounter
-            badgeCounter
-            leaguesCounter
-            winPercentage
-            loosePercentage
-            lv
-            exp
-            nextLv
-          }}
-        }}
-      }}
-      '''
-      return gql(mutation)
+      return Operation(
+          CREATE_TRAINER,
+          {'input': {'discordId': discord_id}},
+          invalidates=['trainers:all', f'trainers:{discord_id}']
+      )
 
   @staticmethod
   def create_league(reference):
-    mutation = f'''
-      mutation{{
-        createLeague(input: {{
-          reference: "{reference}"
-        }}){{
-          league{{
-            id
-            reference
-            startDate
-            endDate
-          }}
-        }}
-      }}
-    '''
-    return gql(mutation)
+    return Operation(
+        CREATE_LEAGUE,
+        {'input': {'reference': reference}},
+        invalidates=['leagues:all']
+    )
 
   @staticmethod
   def create_leader(discord_id, poke_type, role):
-    mutation = f'''
-    mutation{{
-      createLeader(input:{{
-        discordId: "{discord_id}"
-        pokemonType: {poke_type}
-        role: {role}
-      }}){{
-        leader{{
-          id
-          name
-          role
-          pokemonType
-          joinDate
-          battleCounter
-          winPercentage
-          loosePercentage
-          discordId
-          lv
-          nextLv
-          exp
-        }}
-      }}
-    }}
-    '''
-    return gql(mutation)
+    return Operation(
+        CREATE_LEADER,
+        {'input': {
+            'discordId': discord_id,
+            'pokemonType': poke_type,
+            'role': role,
+        }},
+        invalidates=['leaders:all', f'leaders:{discord_id}']
+    )
 
   @staticmethod
   def league_registration(discord_id, league_id, is_trainer):
-    is_trainer = str(is_trainer).lower()
-    mutation = f'''
-    mutation{{
-      leagueRegistration(input:{{
-        discordId: "{discord_id}"
-        league: "{league_id}"
-        isTrainer: {is_trainer}
-      }}){{
-        registration
-      }}
-    }}
-    '''
-    return gql(mutation)
+    return Operation(
+        LEAGUE_REGISTRATION,
+        {'input': {
+            'discordId': discord_id,
+            'league': league_id,
+            'isTrainer': bool(is_trainer),
+        }},
+        invalidates=[
+            'leagues:all',
+            f'leagues:{league_id}',
+            f'scores:{league_id}',
+            'trainers:all',
+            f'trainers:{discord_id}',
+        ]
+    )
 
   @staticmethod
   def battle_registration(league_id, trainer_id, leader_id, winner):
-    mutation = f'''
-        mutation{{
-      battleRegister(input:{{
-        league:"{league_id}"
-        trainer: "{trainer_id}"
-        leader: "{leader_id}"
-        winner: "{winner}"
-      }}){{
-        battle{{
-          id
-          battleDatetime
-          winner
-        }}
-      }}
-    }}
-    '''
-    return gql(mutation)
+    return Operation(
+        BATTLE_REGISTER,
+        {'input': {
+            'league': league_id,
+            'trainer': trainer_id,
+            'leader': leader_id,
+            'winner': winner,
+        }},
+        invalidates=[
+            f'scores:{league_id}',
+            'trainers:all',
+            f'trainers:{trainer_id}',
+            'leaders:all',
+            f'leaders:{leader_id}',
+        ]
+    )
 
   @staticmethod
   def add_badge(discord_id, badge, league):
     """
     Requisição para Bill solicitando a adição de uma insígnia à um treinador
     """
-    mutation = f'''mutation{{
-      addBadgeToTrainer(input:{{
-        discordId: "{discord_id}"
-        badge: "{badge}"
-        league: "{league}"
-      }}){{
-        response
-      }}
-    }}
-    '''
-    return gql(mutation)
+    return Operation(
+        ADD_BADGE,
+        {'input': {
+            'discordId': discord_id,
+            'badge': badge,
+            'league': league,
+        }},
+        invalidates=[
+            f'scores:{league}',
+            'trainers:all',
+            f'trainers:{discord_id}',
+        ]
+    )
 
   @staticmethod
   def update_trainer(discord_id, name=None, fc=None, sd_id=None):
@@ -139,87 +227,67 @@ class Mutations:
     Requisição para Bill solicitando a alteração dos dados
     de um treinador
     """
-    mutation = f'''
-    mutation update_trainer{{
-      updateTrainer(input:{{
-        discordId: "{discord_id}"
-        name: "{name if name else ''}"
-        fc:"{fc if fc else ''}"
-        sdId: "{sd_id if sd_id else ''}"
-      }}) {{
-        trainer{{
-          name
-          sdId
-          fc
-          discordId
-        }}
-      }}
-    }}
-    '''
-
-    return gql(mutation)
+    return Operation(
+        UPDATE_TRAINER,
+        {'input': {
+            'discordId': discord_id,
+            'name': name if name else '',
+            'fc': fc if fc else '',
+            'sdId': sd_id if sd_id else '',
+        }},
+        invalidates=['trainers:all', f'trainers:{discord_id}']
+    )
 
   @staticmethod
   def update_leader(discord_id, **kwargs):
     """
     TODO docstring
     """
+    data = {
+        'discordId': discord_id,
+        'name': kwargs.get('name', ''),
+        'fc': kwargs.get('fc', ''),
+        'sdId': kwargs.get('sd_id', ''),
+        'clauses': kwargs.get('clauses', ''),
+    }
+
     poke_type = kwargs.get('poke_type')
-    poke_type = f'pokemonType: {poke_type.upper()}' if poke_type else ''
+    if poke_type:
+        data['pokemonType'] = poke_type.upper()
 
     role = kwargs.get('role')
-    role = f'role: {role.upper()}' if role else ''
-
-    mutation = f'''
-    mutation{{
-      updateLeader(input:{{
-        discordId: "{discord_id}"
-        name: "{kwargs.get('name', '')}"
-        {poke_type}
-        {role}
-        fc:"{kwargs.get('fc', '')}"
-        sdId: "{kwargs.get('sd_id', '')}"
-        clauses: "{kwargs.get('clauses', '')}"
-      }}){{
-        leader{{
-          name
-          role
-          pokemonType
-          clauses
-          fc
-          sdId
-          discordId
-        }}
-      }}
-    }}
-    '''
-    return gql(mutation)
+    if role:
+        data['role'] = role.upper()
+
+    return Operation(
+        UPDATE_LEADER,
+        {'input': data},
+        invalidates=[
+            'leaders:all',
+            f'leaders:{discord_id}',
+        ]
+    )
 
   @staticmethod
   def update_league(id, **kwargs):
     """
     TODO docstring
     """
+    data = {
+        'id': id,
+        'reference': kwargs.get('reference', ''),
+    }
+
     start_date = kwargs.get('start_date', '')
-    start_date = f'startDate: "{start_date}"' if start_date else ''
+    if start_date:
+        data['startDate'] = start_date
 
     end_date = kwargs.get('end_date', '')
-    end_date = f'endDate: "{end_date}"' if end_date else ''
-
-    mutation = f'''
-    mutation update_league{{
-      updateLeague(input:{{
-        id: "{id}"
-        reference: "{kwargs.get('reference', '')}"	
-        {start_date}
-        {end_date}
-      }}){{
-        league{{
-          reference
-          startDate
-          endDate
-        }}
-      }}
-    }}
-    '''
-    return gql(mutation)
+    if end_date:
+        data['endDate'] = end_date
+
+    return Operation(
+        UPDATE_LEAGUE,
+        {'input': data},
+        invalidates=['leagues:all', f'leagues:{id}']
+    )
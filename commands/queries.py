@@ -1,8 +1,231 @@
 """
 Módulo para definição de queries utilizadas para consultar o
 serviço de ligas da ABP: Bill API
+
+Os documentos são interpretados uma única vez, na importação do módulo, e os
+argumentos de cada consulta são enviados como variáveis graphql.
 """
-from gql import gql
+from util.bill_client import Operation, BatchOperation, parse_document
+
+
+# Cada query possui projeções nomeadas, com somente os campos exibidos por
+# cada comando: 'summary' para listagens e 'detail' para a visão de um item.
+LEAGUE_FIELDS = {
+    'summary': '''
+        id
+        reference
+        startDate
+        endDate
+    ''',
+    'detail': '''
+        id
+        reference
+        startDate
+        endDate
+        competitors{
+            edges{
+                node{
+                    id
+                }
+            }
+        }
+    ''',
+}
+
+LEAGUES = '''
+query leagues($id: ID) {
+    leagues(id: $id) {
+        edges{
+            node{
+                %s
+            }
+        }
+    }
+}
+'''
+
+TRAINER_FIELDS = {
+    'summary': '''
+        discordId
+        lv
+        battleCounter
+    ''',
+    'detail': '''
+        joinDate
+        battleCounter
+        winPercentage
+        loosePercentage
+        lv
+        discordId
+        fc
+        sdId
+        badgeCounter
+        leaguesCounter
+        exp
+        nextLv
+    ''',
+}
+
+TRAINERS = '''
+query trainers($discordId: String, $first: Int, $after: String) {
+    trainers(discordId_Icontains: $discordId, first: $first, after: $after) {
+        pageInfo{
+            hasNextPage
+            endCursor
+        }
+        edges{
+            node{
+                %s
+            }
+        }
+    }
+}
+'''
+
+LEADER_FIELDS = {
+    'summary': '''
+        discordId
+        lv
+        fc
+        pokemonType
+    ''',
+    'detail': '''
+        discordId
+        lv
+        fc
+        role
+        pokemonType
+        battleCounter
+        winPercentage
+        loosePercentage
+        exp
+        nextLv
+        sdId
+    ''',
+}
+
+LEADERS = '''
+  query leaders($discordId: String, $first: Int, $after: String) {
+    leaders(discordId_Icontains: $discordId, first: $first, after: $after) {
+      pageInfo{
+        hasNextPage
+        endCursor
+      }
+      edges{
+        node{
+          %s
+        }
+      }
+    }
+  }
+'''
+
+
+def get_document(template, fields, projection):
+    """
+    Retorna o documento da query com os campos da projeção solicitada.
+    Cada combinação é interpretada uma única vez.
+
+    param : template : <str> : texto da query com um %s no lugar dos campos.
+    param : fields : <dict> : campos de cada projeção.
+    param : projection : <str> : nome da projeção.
+
+    return : <graphql.language.ast.Document>
+    """
+    return parse_document(template % fields[projection])
+
+
+# interpreta as projeções já na importação do módulo
+for _template, _fields in [(LEAGUES, LEAGUE_FIELDS),
+                           (TRAINERS, TRAINER_FIELDS),
+                           (LEADERS, LEADER_FIELDS)]:
+    for _projection in _fields:
+        get_document(_template, _fields, _projection)
+
+
+SCORES = parse_document('''
+query scores($leagueId: ID!, $first: Int, $after: String) {
+  scores(league_Id_In: $leagueId, first: $first, after: $after){
+    pageInfo{
+      hasNextPage
+      endCursor
+    }
+    edges{
+    node{
+        trainer{
+          discordId
+          lv
+        }
+        wins
+        losses
+        badges
+        standby
+      }
+    }
+  }
+}
+''')
+
+TRAINER_SCORE = parse_document('''
+query trainerScore($discordId: String!, $leagueId: ID!) {
+  scores(
+      trainer_DiscordId: $discordId
+      league_Id_In: $leagueId
+  ){
+    edges{
+      node{
+        trainer{
+          discordId
+          lv
+        }
+        wins
+        losses
+        badges
+        standby
+        battles(last: 1){
+          edges{
+            node{
+              battleDatetime
+              winner
+              leader{
+                discordId
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+''')
+
+STANDBY_TRAINERS = parse_document('''
+query standbyTrainers($leagueId: ID!) {
+  scores(league_Id_In: $leagueId){
+    edges{
+      node{
+        trainer{
+          discordId
+        }
+        battles(last: 1){
+          edges{
+            node{
+              battleDatetime
+            }
+          }
+        }
+        standby
+        }
+      }
+   }
+}
+''')
+
+VERSION = parse_document('''
+query{
+  apiVersion
+}
+''')
 
 
 class Query:
@@ -11,228 +234,95 @@ class Query:
     """
 
     @staticmethod
-    def get_leagues(id=None):
+    def batch(*operations):
         """
-        Retorna a query de ligas
-        """
-        filters = '' if not id else f'(id:"{id}")' 
-        query = '''
-        query {
-            leagues %s {
-                edges{
-                    node{
-                        id
-                        reference
-                        startDate
-                        endDate
-                        description
-                        gymLeaders{
-                            edges{
-                                node{
-                                    id
-                                    name
-                                    pokemonType
-                                }
-                            }
-                        }
-                        eliteFour{
-                        edges{
-                            node{
-                                id
-                                name
-                                pokemonType
-                                }
-                        }
-                        }
-                        champion{
-                            id
-                            name
-                            pokemonType
-                        }
-                        competitors{
-                        edges{
-                            node{
-                                id
-                                name
-                                joinDate
-                            }
-                        }
-                        }
-                        winner{
-                            id
-                            name
-                        }
-                    }
-                }
-            }
-        }
-        ''' % filters
+        Combina várias queries em um único documento com aliases, resolvido
+        em uma única requisição ao Bill. A resposta de cada query é obtida
+        com `split`:
 
-        return gql(query)
+            batch = Query.batch(Query.get_scores(a), Query.get_scores(b))
+            scores_a, scores_b = batch.split(response)
+        """
+        return BatchOperation(operations)
 
     @staticmethod
-    def get_trainers(id=None):
+    def get_leagues(id=None, projection='summary'):
         """
-        Retorna a query de treinadores
+        Retorna a query de ligas.
+        `projection` seleciona os campos retornados: summary ou detail.
         """
-        filters = '' if not id else f'(discordId_Icontains:"{id}")' 
-        query = '''
-        query {
-            trainers %s {
-                edges{
-                    node{
-                        id
-                        name
-                        joinDate
-                        battleCounter
-                        winPercentage
-                        loosePercentage
-                        lv
-                        discordId
-                        fc
-                        sdId
-                        badgeCounter
-                        leaguesCounter
-                        exp
-                        nextLv
-                    }
-                }
-            }
-        }
-        ''' % filters
+        return Operation(
+            get_document(LEAGUES, LEAGUE_FIELDS, projection),
+            {'id': id},
+            kind='leagues',
+            tags=['leagues', f'leagues:{id or "all"}']
+        )
 
-        return gql(query)
+    @staticmethod
+    def get_trainers(id=None, first=None, after=None, projection='detail'):
+        """
+        Retorna a query de treinadores.
+        `first` e `after` selecionam uma página da listagem e `projection` os
+        campos retornados: summary ou detail.
+        """
+        return Operation(
+            get_document(TRAINERS, TRAINER_FIELDS, projection),
+            {'discordId': id, 'first': first, 'after': after},
+            kind='trainers',
+            tags=['trainers', f'trainers:{id or "all"}']
+        )
 
     @staticmethod
-    def get_leaders(id=None):
+    def get_leaders(id=None, first=None, after=None, projection='detail'):
         """
-        Requisição solicitando a consulta de líderes registrados
+        Requisição solicitando a consulta de líderes registrados.
+        `first` e `after` selecionam uma página da listagem e `projection` os
+        campos retornados: summary ou detail.
         """
-        filters = '' if not id else f'(discordId_Icontains:"{id}")'
-        query = f'''
-          query {{
-            leaders {filters} {{
-              edges{{
-                node{{
-                  id
-                  discordId
-                  lv
-                  fc
-                  name
-                  role
-                  pokemonType
-                  joinDate
-                  battleCounter
-                  winPercentage
-                  loosePercentage
-                  exp
-                  nextLv
-                  sdId
-                }}
-              }}
-            }}
-          }}
-        '''
-
-        return gql(query)
+        return Operation(
+            get_document(LEADERS, LEADER_FIELDS, projection),
+            {'discordId': id, 'first': first, 'after': after},
+            kind='leaders',
+            tags=['leaders', f'leaders:{id or "all"}']
+        )
 
     @staticmethod
-    def get_scores(league_id):
+    def get_scores(league_id, first=None, after=None):
         """
-        Requisição solicitando a consulta do score dos treinadores de uma liga
+        Requisição solicitando a consulta do score dos treinadores de uma liga.
+        `first` e `after` selecionam uma página da listagem.
         """
-        query = f'''
-        query{{
-          scores(league_Id_In: "{league_id}"){{
-            edges{{
-            node{{
-                trainer{{
-                  discordId
-                  lv
-                }}
-                wins
-                losses
-                badges
-                standby
-              }}
-            }}
-          }}
-        }}
-        '''
-        return gql(query)
+        return Operation(
+            SCORES,
+            {'leagueId': league_id, 'first': first, 'after': after},
+            kind='scores',
+            tags=['scores', f'scores:{league_id}']
+        )
 
     @staticmethod
     def get_trainer_score(discord_id, league_id):
         """
         Solicita o score de um treinador específico em uma liga
         """
-        query = f"""
-        query scores{{
-          scores(
-              trainer_DiscordId:  "{discord_id}"
-              league_Id_In: "{league_id}"
-          ){{
-            edges{{
-              node{{
-                trainer{{
-                  discordId
-                  lv
-                }}
-                wins
-                losses
-                badges
-                standby
-                battles(last: 1){{
-                  edges{{
-                    node{{
-                      battleDatetime
-                      winner
-                      leader{{
-                        discordId
-                      }}
-                    }}
-                  }}
-                }}
-              }}
-            }}
-          }}
-        }}
-        """
-        return gql(query)
+        return Operation(
+            TRAINER_SCORE,
+            {'discordId': discord_id, 'leagueId': league_id},
+            kind='scores',
+            tags=['scores', f'scores:{league_id}']
+        )
 
     @staticmethod
     def get_standby_trainers(league_id):
-        query = f'''
-        query scores {{
-          scores(league_Id_In:  "{league_id}"){{
-            edges{{
-              node{{
-                trainer{{
-                  discordId
-                }}
-                battles(last: 1){{
-                  edges{{
-                    node{{
-                      battleDatetime
-                    }}
-                  }}
-                }}
-                standby
-                }}
-              }}
-           }}
-        }}
-        '''
-        return gql(query)
+        return Operation(
+            STANDBY_TRAINERS,
+            {'leagueId': league_id},
+            kind='scores',
+            tags=['scores', f'scores:{league_id}']
+        )
 
     @staticmethod
     def get_version():
       """
       Consulta a versão da API Bill
       """
-      query = f'''
-      query{{
-        apiVersion
-      }}
-      '''
-      return gql(query)
+      return Operation(VERSION, kind='version', tags=['version'])
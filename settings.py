@@ -8,15 +8,62 @@ TOKEN = config('TOKEN')
 ADMIN_CHANNEL = config('ADMIN_CHANNEL')
 GENERAL_CHANNEL = config('GENERAL_CHANNEL')
 
-POKE_API_URL = 'https://pokeapi.co/api/v2/pokemon/'
-ITEM_API_URL = 'https://pokeapi.co/api/v2/item/'
-ABILITY_API_URL = 'https://pokeapi.co/api/v2/ability/'
+POKE_API_URL = config('POKE_API_URL', default='https://pokeapi.co/api/v2/pokemon/')
+ITEM_API_URL = config('ITEM_API_URL', default='https://pokeapi.co/api/v2/item/')
+ABILITY_API_URL = config('ABILITY_API_URL', default='https://pokeapi.co/api/v2/ability/')
 BILL_API_URL = config('BILL')
-EFFECTIVENESS_API_URL = 'http://bit.ly/2ZKJ5UW'
+BILL_POOL_SIZE = config('BILL_POOL_SIZE', default=10, cast=int)
+BILL_WORKERS = config('BILL_WORKERS', default=BILL_POOL_SIZE, cast=int)
+BILL_TIMEOUT = config('BILL_TIMEOUT', default=10, cast=float)
+# janela (ms) para combinar queries simultâneas em uma única requisição
+BILL_BATCH_WINDOW_MS = config('BILL_BATCH_WINDOW_MS', default=0, cast=float)
+BILL_BATCH_MAX = config('BILL_BATCH_MAX', default=10, cast=int)
+BILL_PAGE_SIZE = config('BILL_PAGE_SIZE', default=20, cast=int)
+# novas tentativas das queries quando o Bill não responde, com backoff (s)
+BILL_RETRIES = config('BILL_RETRIES', default=2, cast=int)
+BILL_BACKOFF_BASE = config('BILL_BACKOFF_BASE', default=0.2, cast=float)
+BILL_BACKOFF_MAX = config('BILL_BACKOFF_MAX', default=2, cast=float)
+# falhas seguidas que abrem o circuito e segundos até a chamada de teste
+BILL_BREAKER_THRESHOLD = config('BILL_BREAKER_THRESHOLD', default=5, cast=int)
+BILL_BREAKER_RESET = config('BILL_BREAKER_RESET', default=30, cast=float)
+BILL_CACHE_SIZE = config('BILL_CACHE_SIZE', default=512, cast=int)
+# tempo de vida (segundos) no cache das respostas de cada tipo de query
+BILL_CACHE_TTL = {
+    'leagues': 600,
+    'leaders': 600,
+    'trainers': 120,
+    'scores': 30,
+    'version': 3600,
+}
+# cache em disco da PokeAPI; MAX_AGE 0 nunca busca novamente um recurso salvo
+POKEAPI_CACHE_FILE = config('POKEAPI_CACHE_FILE', default='pokeapi_cache.sqlite3')
+POKEAPI_CACHE_MAX_AGE = config('POKEAPI_CACHE_MAX_AGE', default=0, cast=float)
+POKEAPI_NEGATIVE_TTL = config('POKEAPI_NEGATIVE_TTL', default=86400, cast=float)
+# conexões com a PokeAPI: máximo no pool, simultâneas por host e prazo (s)
+POKEAPI_POOL_SIZE = config('POKEAPI_POOL_SIZE', default=20, cast=int)
+POKEAPI_PER_HOST = config('POKEAPI_PER_HOST', default=8, cast=int)
+POKEAPI_TIMEOUT = config('POKEAPI_TIMEOUT', default=10, cast=float)
+# pokedex local gerada a partir de files/pokes.txt
+POKEDEX_FILE = config('POKEDEX_FILE', default='files/pokedex.json')
 
 BACKEND_URL = config('BACKEND_URL')
 RANKED_SPREADSHEET_ID = '1E2cQBWeQc9JkCKv3BUPClGwulPXXg-4hTYotuUKmoJI'
 TRAINER_DB_SPREADSHEET_ID = '18idH8DSvBhbgK9grKeXmV6DjKJpIsZl4dxneqKZDl3A'
+SHEETS_KEYFILE = config('SHEETS_KEYFILE', default='oak_ss_api_keys.json')
+SHEETS_DISCOVERY_FILE = config('SHEETS_DISCOVERY_FILE', default='files/discovery/sheets.v4.json')
+# segundos antes da expiração em que o token do Sheets é renovado
+SHEETS_TOKEN_MARGIN = config('SHEETS_TOKEN_MARGIN', default=300, cast=float)
+# chamadas simultâneas ao Google Sheets e prazo (segundos) de cada chamada
+SHEETS_WORKERS = config('SHEETS_WORKERS', default=2, cast=int)
+SHEETS_TIMEOUT = config('SHEETS_TIMEOUT', default=30, cast=float)
+# consulta a revisão da planilha no Drive antes de baixar os valores
+SHEETS_CHECK_REVISION = config('SHEETS_CHECK_REVISION', default=True, cast=bool)
+# intervalo (segundos) de atualização da cópia em memória da ranked
+RANKED_REFRESH_INTERVAL = config('RANKED_REFRESH_INTERVAL', default=300, cast=float)
+# cópia em disco da ranked, carregada na inicialização
+RANKED_SNAPSHOT_FILE = config('RANKED_SNAPSHOT_FILE', default='ranked_snapshot.json')
+# resultados da validação do formulário da ranked, por linha
+RANKED_VALIDATION_FILE = config('RANKED_VALIDATION_FILE', default='ranked_validation.json')
 SCORE_INDEX = 4
 SD_NAME_INDEX = 1
 COLOR_INDEX = 1
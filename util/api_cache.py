@@ -0,0 +1,176 @@
+"""
+Módulo para o cache em disco das respostas da PokeAPI.
+
+Os dados de pokémons, itens e habilidades praticamente não mudam, então cada
+recurso é buscado uma única vez e salvo em um banco SQLite local, indexado
+pelo tipo do recurso e pelo nome. Nomes desconhecidos também são salvos
+(resultado negativo), por um tempo limitado. Opcionalmente os recursos podem
+ser buscados novamente após uma idade máxima (revalidação).
+
+No event loop, `async_fetch` consulta o banco em uma thread e aguarda a
+busca assíncrona do recurso, sem bloquear os demais comandos.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+from collections import namedtuple
+from time import time
+
+
+# recurso salvo; `data` vazio indica um nome desconhecido
+CacheEntry = namedtuple('CacheEntry', ['data', 'fetched_at'])
+
+
+class ApiCache:
+    """
+    Cache em disco dos recursos de uma API, indexado por tipo e nome.
+
+    param : path : <str> : arquivo do banco SQLite.
+    param : max_age : <float> : idade, em segundos, a partir da qual um
+                                recurso é buscado novamente; 0 nunca revalida.
+    param : negative_ttl : <float> : segundos em que um nome desconhecido
+                                     continua sendo considerado desconhecido.
+    """
+
+    def __init__(self, path, max_age=0, negative_ttl=86400):
+        self.path = path
+        self.max_age = max_age
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS resources ('
+                ' kind TEXT NOT NULL,'
+                ' name TEXT NOT NULL,'
+                ' data TEXT NOT NULL,'
+                ' fetched_at REAL NOT NULL,'
+                ' PRIMARY KEY (kind, name))'
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def get(self, kind, name):
+        """
+        Retorna o recurso salvo, mesmo que precise ser revalidado.
+
+        param : kind : <str> : tipo do recurso (pokemon, item, ability).
+        param : name : <str>
+
+        return : <CacheEntry> : ou None quando o recurso não foi salvo.
+        """
+        with self._lock:
+            row = self._connect().execute(
+                'SELECT data, fetched_at FROM resources WHERE kind = ? AND name = ?',
+                (kind, name)
+            ).fetchone()
+
+        if row is None:
+            return None
+        return CacheEntry(json.loads(row[0]), row[1])
+
+    def set(self, kind, name, data):
+        """
+        Salva um recurso. Um dicionário vazio salva o nome como desconhecido.
+
+        param : kind : <str>
+        param : name : <str>
+        param : data : <dict>
+        """
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                'INSERT OR REPLACE INTO resources (kind, name, data, fetched_at)'
+                ' VALUES (?, ?, ?, ?)',
+                (kind, name, json.dumps(data), time())
+            )
+            connection.commit()
+
+    def is_fresh(self, entry):
+        """
+        Informa se o recurso salvo pode ser usado sem buscá-lo novamente.
+
+        param : entry : <CacheEntry>
+
+        return : <bool>
+        """
+        age = time() - entry.fetched_at
+        if not entry.data:
+            return age < self.negative_ttl
+        return not self.max_age or age < self.max_age
+
+    def fetch(self, kind, name, loader):
+        """
+        Retorna o recurso salvo ou, quando ausente ou vencido, o busca com
+        `loader`. Caso a busca falhe, o recurso salvo continua sendo usado.
+
+        param : kind : <str>
+        param : name : <str>
+        param : loader : <callable> : recebe o nome e retorna os dados do
+                                      recurso, {} para um nome desconhecido
+                                      ou None para uma falha temporária.
+
+        return : <dict>
+        """
+        entry = self.get(kind, name)
+        if entry is not None and self.is_fresh(entry):
+            self.hits += 1
+            return entry.data
+
+        self.misses += 1
+        try:
+            data = loader(name)
+        except Exception:
+            if entry is None:
+                raise
+            return entry.data
+
+        if data is None:
+            return entry.data if entry is not None else {}
+
+        self.set(kind, name, data)
+        return data
+
+    async def async_fetch(self, kind, name, loader, executor=None):
+        """
+        Versão assíncrona de `fetch`, para chamadas feitas no event loop.
+        As consultas ao banco são feitas em `executor`.
+
+        param : kind : <str>
+        param : name : <str>
+        param : loader : <callable> : recebe o nome e retorna a coroutine que
+                                      busca o recurso, com o mesmo retorno
+                                      do `loader` de `fetch`.
+        param : executor : <concurrent.futures.Executor> : None utiliza o
+                                                            executor padrão.
+
+        return : <dict>
+        """
+        loop = asyncio.get_event_loop()
+        entry = await loop.run_in_executor(executor, self.get, kind, name)
+        if entry is not None and self.is_fresh(entry):
+            self.hits += 1
+            return entry.data
+
+        self.misses += 1
+        try:
+            data = await loader(name)
+        except Exception:
+            if entry is None:
+                raise
+            return entry.data
+
+        if data is None:
+            return entry.data if entry is not None else {}
+
+        await loop.run_in_executor(executor, self.set, kind, name, data)
+        return data
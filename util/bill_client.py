@@ -0,0 +1,670 @@
+"""
+Módulo para o client GraphQL de acesso ao Bill.
+
+Os clients são criados uma única vez e compartilhados por todos os comandos,
+reaproveitando um pool de conexões keep-alive com o Bill em vez de abrir uma
+nova conexão TCP/TLS a cada comando.
+
+As requisições são executadas em um pool limitado de threads para que uma
+resposta lenta do Bill não bloqueie o event loop do discord.
+
+As respostas das queries ficam em um cache em memória com TTL por tipo de
+dado. As mutations invalidam somente as entradas que alteram. Queries
+idênticas feitas ao mesmo tempo compartilham uma única requisição, e
+queries diferentes podem ser combinadas em um único documento graphql.
+
+Listagens longas são percorridas por páginas, com paginação por cursor.
+Uma página específica é buscada diretamente, a partir do cursor calculado
+pela sua posição.
+
+As chamadas passam por um circuit breaker: queries que falham por
+indisponibilidade do Bill são tentadas novamente com backoff exponencial e,
+com o circuito aberto, falham na hora. Nesses casos a última resposta obtida
+para a query, ainda que expirada, é retornada quando existir.
+"""
+import asyncio
+from ast import literal_eval
+from base64 import b64encode
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy
+from functools import lru_cache, partial
+from gql import Client, gql
+from gql.transport.requests import RequestsHTTPTransport
+from graphql.language import ast
+from requests.adapters import HTTPAdapter
+from settings import (BILL_API_URL, BILL_POOL_SIZE, BILL_TIMEOUT, BILL_WORKERS,
+                      BILL_CACHE_SIZE, BILL_CACHE_TTL, BILL_BATCH_WINDOW_MS,
+                      BILL_BATCH_MAX, BILL_PAGE_SIZE, BILL_RETRIES,
+                      BILL_BACKOFF_BASE, BILL_BACKOFF_MAX,
+                      BILL_BREAKER_THRESHOLD, BILL_BREAKER_RESET)
+from util.cache import TTLCache
+from util.circuit_breaker import CircuitBreaker, CircuitOpenError, backoff_delay
+from util.single_flight import SingleFlight
+
+
+# página de uma connection do Bill
+Page = namedtuple('Page', ['number', 'nodes', 'has_next'])
+
+# clients compartilhados, indexados por (url, auth)
+_clients = {}
+
+# threads dedicadas às requisições bloqueantes ao Bill
+_executor = ThreadPoolExecutor(
+    max_workers=BILL_WORKERS,
+    thread_name_prefix='bill'
+)
+
+# respostas das queries do Bill
+query_cache = TTLCache(maxsize=BILL_CACHE_SIZE)
+
+# queries idênticas em andamento
+bill_flight = SingleFlight()
+
+# disponibilidade do Bill
+bill_breaker = CircuitBreaker(BILL_BREAKER_THRESHOLD, BILL_BREAKER_RESET)
+
+# incrementado a cada invalidação, evita que uma query iniciada antes de uma
+# mutation grave no cache uma resposta já desatualizada
+_cache_generation = 0
+
+
+@lru_cache(maxsize=256)
+def parse_document(source):
+    """
+    Retorna o documento graphql já interpretado. Cada texto é interpretado
+    uma única vez, mantendo o parser fora do caminho das requisições.
+
+    param : source : <str> : texto da query ou mutation.
+
+    return : <graphql.language.ast.Document>
+    """
+    return gql(source)
+
+
+class Operation:
+    """
+    Requisição ao Bill: documento graphql e os valores das suas variáveis.
+
+    Queries informam o tipo de dado consultado (`kind`), que define o TTL da
+    resposta no cache, e as tags com as quais a resposta é armazenada.
+    Mutations informam as tags das entradas de cache que deixam desatualizadas.
+
+    param : document : <graphql.language.ast.Document>
+    param : variables : <dict> : valores das variáveis; None é omitido.
+    param : kind : <str> : tipo de dado consultado (chave de BILL_CACHE_TTL).
+    param : tags : <iterable> : tags da resposta no cache.
+    param : invalidates : <iterable> : tags invalidadas em caso de sucesso.
+    """
+
+    def __init__(self, document, variables=None, kind=None, tags=(),
+                 invalidates=()):
+        self.document = document
+        self.variables = {
+            name: value for name, value in (variables or {}).items()
+            if value is not None
+        }
+        self.kind = kind
+        self.tags = tuple(tags)
+        self.invalidates = tuple(invalidates)
+        self.key = None
+
+        # os documentos são estáticos, então o próprio documento e os valores
+        # das variáveis identificam a resposta no cache
+        if kind in BILL_CACHE_TTL:
+            self.key = (document, tuple(sorted(self.variables.items())))
+
+    @property
+    def cacheable(self):
+        return self.key is not None
+
+    @property
+    def is_query(self):
+        return self.document.definitions[0].operation == 'query'
+
+
+def _prefix_variables(node, prefix):
+    """
+    Copia um nó do documento renomeando as variáveis com o prefixo informado.
+    """
+    if isinstance(node, ast.Variable):
+        return ast.Variable(name=ast.Name(value=prefix + node.name.value))
+
+    if isinstance(node, list):
+        return [_prefix_variables(item, prefix) for item in node]
+
+    if isinstance(node, ast.Node):
+        node_copy = copy(node)
+        for field in node._fields:
+            setattr(node_copy, field, _prefix_variables(getattr(node, field), prefix))
+        return node_copy
+
+    return node
+
+
+class BatchOperation(Operation):
+    """
+    Várias queries combinadas em um único documento graphql, cada campo raiz
+    recebendo um alias próprio, de modo que sejam resolvidas em uma única
+    requisição ao Bill. A resposta combinada é separada com `split`.
+
+    param : operations : <list> : queries a combinar.
+    """
+
+    def __init__(self, operations):
+        self.operations = list(operations)
+        self._aliases = []  # por query: [(alias no lote, chave original)]
+        selections = []
+        variable_definitions = []
+        variables = {}
+
+        for i, operation in enumerate(self.operations):
+            # as variáveis de cada query recebem um prefixo para não colidirem
+            prefix = f'q{i}_'
+            definition = _prefix_variables(operation.document.definitions[0], prefix)
+            variable_definitions.extend(definition.variable_definitions or [])
+            variables.update({
+                prefix + name: value
+                for name, value in operation.variables.items()
+            })
+
+            aliases = []
+            for field in definition.selection_set.selections:
+                original = (field.alias or field.name).value
+                alias = prefix + original
+                aliases.append((alias, original))
+                field.alias = ast.Name(value=alias)
+                selections.append(field)
+            self._aliases.append(aliases)
+
+        document = ast.Document(definitions=[
+            ast.OperationDefinition(
+                operation='query',
+                variable_definitions=variable_definitions,
+                selection_set=ast.SelectionSet(selections=selections)
+            )
+        ])
+        super().__init__(document, variables)
+
+    def split(self, response):
+        """
+        Separa a resposta combinada na resposta de cada query do lote.
+
+        param : response : <dict>
+
+        return : <list>
+        """
+        return [
+            {original: response.get(alias) for alias, original in aliases}
+            for aliases in self._aliases
+        ]
+
+
+def build_client(url, auth=None, pool_size=BILL_POOL_SIZE):
+    """
+    Constrói um client graphql com um pool de conexões próprio.
+
+    param : url : <str> : url do Bill
+    param : auth : <str> : hash de autorização.
+    param : pool_size : <int> : máximo de conexões mantidas abertas no pool.
+
+    return : <gql.Client>
+    """
+    headers = None
+    if auth:
+        headers = {
+            'content-type': 'application/json',
+            'auth': '{}'.format(auth)
+        }
+
+    transport = RequestsHTTPTransport(url=url, use_json=True, headers=headers)
+
+    # a sessão do transport mantém as conexões abertas entre as requisições
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    transport.session.mount('http://', adapter)
+    transport.session.mount('https://', adapter)
+
+    return Client(transport=transport, fetch_schema_from_transport=False)
+
+
+def get_client(url=BILL_API_URL, auth=None):
+    """
+    Retorna o client compartilhado para a url e autorização informadas.
+    Requisições autenticadas e anônimas utilizam pools de conexões separados.
+
+    param : url : <str> : url do Bill
+    param : auth : <str> : hash de autorização.
+
+    return : <gql.Client>
+    """
+    key = (url, auth)
+    if key not in _clients:
+        _clients[key] = build_client(url, auth=auth)
+
+    return _clients[key]
+
+
+def close_clients():
+    """
+    Encerra as conexões de todos os clients compartilhados.
+    """
+    for client in _clients.values():
+        client.close()
+    _clients.clear()
+
+
+async def _post(operation, auth, timeout):
+    """
+    Envia a operação ao Bill em uma thread do pool do Bill.
+    """
+    client = get_client(auth=auth)
+    call = partial(
+        client.execute,
+        operation.document,
+        variable_values=operation.variables,
+        timeout=timeout
+    )
+    loop = asyncio.get_event_loop()
+
+    return await asyncio.wait_for(
+        loop.run_in_executor(_executor, call),
+        timeout
+    )
+
+
+async def _request(operation, auth, timeout):
+    """
+    Envia a operação ao Bill através do circuit breaker.
+
+    Somente falhas de disponibilidade (timeout, conexão, erro HTTP) contam
+    para o circuito; um erro graphql indica que o Bill está respondendo.
+    Queries que falham dessa forma são tentadas novamente até BILL_RETRIES
+    vezes; mutations não, para não serem aplicadas em dobro.
+
+    raises : CircuitOpenError : caso o circuito esteja aberto.
+    """
+    retries = BILL_RETRIES if operation.is_query else 0
+
+    for attempt in range(retries + 1):
+        if not bill_breaker.allow():
+            raise CircuitOpenError('Bill indisponível')
+
+        try:
+            response = await _post(operation, auth, timeout)
+        except asyncio.CancelledError:
+            # o cancelamento não indica que o Bill está fora do ar
+            bill_breaker.release()
+            raise
+        except Exception as err:
+            if get_error_message(err):
+                bill_breaker.record_success()
+                raise
+
+            bill_breaker.record_failure()
+            if attempt == retries:
+                raise
+
+            await asyncio.sleep(
+                backoff_delay(attempt, BILL_BACKOFF_BASE, BILL_BACKOFF_MAX)
+            )
+        else:
+            bill_breaker.record_success()
+            return response
+
+
+async def _request_batch(operations, auth, timeout):
+    """
+    Envia várias queries ao Bill em uma única requisição.
+
+    Caso o Bill rejeite o lote com um erro graphql, as queries são reenviadas
+    individualmente para que o erro de uma não afete as demais.
+
+    return : <list> : resposta, ou a exceção, de cada query.
+    """
+    if len(operations) == 1:
+        requests = [_request(operations[0], auth, timeout)]
+        return await asyncio.gather(*requests, return_exceptions=True)
+
+    batch = BatchOperation(operations)
+    try:
+        return batch.split(await _request(batch, auth, timeout))
+    except Exception as err:
+        if not get_error_message(err):
+            return [err] * len(operations)
+
+    requests = [_request(operation, auth, timeout) for operation in operations]
+    return await asyncio.gather(*requests, return_exceptions=True)
+
+
+class MicroBatcher:
+    """
+    Agrupa as queries que chegam dentro de uma janela de alguns milissegundos
+    em uma única requisição ao Bill.
+
+    param : window : <float> : duração da janela em segundos.
+    param : max_size : <int> : quantidade de queries que encerra a janela.
+    """
+
+    def __init__(self, window, max_size):
+        self.window = window
+        self.max_size = max_size
+        self._pending = {}  # auth -> [(operation, future)]
+        self._timers = {}  # auth -> fim da janela agendado
+        self.requests = 0
+        self.batched = 0
+
+    def submit(self, operation, auth, timeout):
+        """
+        Agenda a query para o próximo lote.
+
+        return : <asyncio.Future> : resposta da query.
+        """
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(auth, [])
+        pending.append((operation, future))
+
+        if len(pending) == 1:
+            self._timers[auth] = loop.call_later(self.window, self._flush, auth, timeout)
+        elif len(pending) >= self.max_size:
+            self._flush(auth, timeout)
+
+        return future
+
+    def _flush(self, auth, timeout):
+        # a janela encerrada antes do tempo não deve fechar o próximo lote
+        timer = self._timers.pop(auth, None)
+        if timer is not None:
+            timer.cancel()
+
+        pending = self._pending.pop(auth, None)
+        if pending:
+            asyncio.ensure_future(self._send(pending, auth, timeout))
+
+    async def _send(self, pending, auth, timeout):
+        self.requests += 1
+        self.batched += len(pending)
+
+        operations = [operation for operation, _ in pending]
+        try:
+            responses = await _request_batch(operations, auth, timeout)
+        except asyncio.CancelledError:
+            for _, future in pending:
+                future.cancel()
+            raise
+        except Exception as err:
+            # sem resposta do lote, todas as queries falham com o mesmo erro
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(err)
+            return
+
+        for (_, future), response in zip(pending, responses):
+            if future.done():
+                continue
+            if isinstance(response, Exception):
+                future.set_exception(response)
+            else:
+                future.set_result(response)
+
+
+# janela de agrupamento de queries independentes (desativada quando 0)
+micro_batcher = None
+if BILL_BATCH_WINDOW_MS > 0:
+    micro_batcher = MicroBatcher(BILL_BATCH_WINDOW_MS / 1000, BILL_BATCH_MAX)
+
+
+async def _cached_request(operation, key, auth, timeout):
+    """
+    Envia uma query ao Bill e armazena a resposta no cache.
+    """
+    generation = _cache_generation
+    if micro_batcher is not None:
+        response = await micro_batcher.submit(operation, auth, timeout)
+    else:
+        response = await _request(operation, auth, timeout)
+
+    if generation == _cache_generation:
+        ttl = BILL_CACHE_TTL[operation.kind]
+        query_cache.set(key, response, ttl, operation.tags)
+
+    return response
+
+
+async def async_execute(operation, auth=None, timeout=BILL_TIMEOUT):
+    """
+    Executa uma query ou mutation no Bill sem bloquear o event loop.
+    A requisição é feita em uma thread do pool do Bill e aguardada por no
+    máximo `timeout` segundos.
+
+    Queries ainda válidas no cache são respondidas sem acessar o Bill e
+    queries idênticas simultâneas compartilham uma única requisição.
+    Mutations bem sucedidas invalidam as entradas de cache que alteram.
+
+    param : operation : <Operation> : Query ou Mutation.
+    param : auth : <str> : hash de autorização.
+    param : timeout : <float> : tempo máximo de espera em segundos.
+
+    return : <dict> : dados da resposta.
+    raises : asyncio.TimeoutError : caso o Bill não responda a tempo.
+    raises : CircuitOpenError : caso o Bill esteja indisponível.
+    """
+    global _cache_generation
+
+    if operation.cacheable:
+        key = (operation.key, auth)
+        response = query_cache.get(key)
+        if response is not None:
+            return response
+
+        try:
+            return await bill_flight.async_do(
+                key,
+                partial(_cached_request, operation, key, auth, timeout)
+            )
+        except Exception as err:
+            return _stale_or_raise(key, err)
+
+    response = await _request(operation, auth, timeout)
+
+    if operation.invalidates:
+        query_cache.invalidate(*operation.invalidates)
+        _cache_generation += 1
+
+    return response
+
+
+async def async_execute_many(operations, auth=None, timeout=BILL_TIMEOUT):
+    """
+    Executa várias queries no Bill com uma única requisição, combinando-as
+    em um documento com aliases. Queries ainda válidas no cache ou idênticas
+    a queries em andamento não são enviadas.
+
+    param : operations : <list> : queries a executar.
+    param : auth : <str> : hash de autorização.
+    param : timeout : <float> : tempo máximo de espera em segundos.
+
+    return : <list> : resposta de cada query, na mesma ordem.
+    """
+    responses = [None] * len(operations)
+    missing = []
+    for i, operation in enumerate(operations):
+        if operation.cacheable:
+            responses[i] = query_cache.get((operation.key, auth))
+        if responses[i] is None:
+            missing.append(i)
+
+    if not missing:
+        return responses
+
+    # queries idênticas em andamento, inclusive vindas de `async_execute`,
+    # são aguardadas em vez de enviadas novamente
+    keys = {}
+    for i in missing:
+        operation = operations[i]
+        keys[i] = (operation.key, auth) if operation.cacheable else object()
+    pending = {keys[i]: operations[i] for i in missing}
+
+    generation = _cache_generation
+
+    async def send(flight_keys):
+        batch = [pending[key] for key in flight_keys]
+        results = await _request_batch(batch, auth, timeout)
+
+        for operation, response in zip(batch, results):
+            if isinstance(response, Exception) or not operation.cacheable:
+                continue
+            if generation == _cache_generation:
+                ttl = BILL_CACHE_TTL[operation.kind]
+                query_cache.set((operation.key, auth), response, ttl, operation.tags)
+
+        return results
+
+    results = await bill_flight.async_do_many([keys[i] for i in missing], send)
+
+    for i, response in zip(missing, results):
+        operation = operations[i]
+        if isinstance(response, Exception):
+            if not operation.cacheable:
+                raise response
+            responses[i] = _stale_or_raise(keys[i], response)
+            continue
+
+        responses[i] = response
+
+    return responses
+
+
+def _stale_or_raise(key, err):
+    """
+    Retorna a última resposta em cache da query quando o Bill está
+    indisponível. Erros graphql e queries sem resposta anterior são
+    propagados.
+    """
+    response = query_cache.get_stale(key)
+    if response is None or get_error_message(err):
+        raise err
+
+    return response
+
+
+def get_error_message(err):
+    """
+    Extrai a mensagem de erro retornada pelo Bill. Para erros que não vieram
+    do GraphQL (timeouts, falhas de conexão) retorna uma string vazia.
+
+    param : err : <Exception>
+
+    return : <str>
+    """
+    try:
+        return literal_eval(err.args[0]).get('message') or ''
+    except (IndexError, ValueError, SyntaxError, AttributeError):
+        return ''
+
+
+def _consume_result(future):
+    """
+    Marca o resultado de uma requisição antecipada como lido, evitando avisos
+    de exceções não tratadas quando ninguém chega a utilizá-la.
+    """
+    if not future.cancelled():
+        future.exception()
+
+
+async def paginate(query, connection, page_size=BILL_PAGE_SIZE):
+    """
+    Percorre uma connection relay do Bill página a página, utilizando a
+    paginação por cursor (`first`/`after`). Enquanto uma página é consumida a
+    seguinte já é requisitada, ficando disponível no cache.
+
+    param : query : <callable> : recebe `first` e `after` e retorna a query.
+    param : connection : <str> : nome da connection na resposta (ex: 'scores').
+    param : page_size : <int> : quantidade de itens por página.
+
+    yield : <Page> : página com seu número, nós e se existe uma próxima.
+    """
+    number = 1
+    next_page = asyncio.ensure_future(
+        async_execute(query(first=page_size, after=None))
+    )
+
+    while next_page is not None:
+        data = (await next_page)[connection]
+        page_info = data['pageInfo']
+
+        next_page = None
+        if page_info['hasNextPage']:
+            next_page = asyncio.ensure_future(
+                async_execute(query(first=page_size, after=page_info['endCursor']))
+            )
+            next_page.add_done_callback(_consume_result)
+
+        yield Page(
+            number,
+            [edge['node'] for edge in data['edges']],
+            page_info['hasNextPage']
+        )
+        number += 1
+
+
+def offset_cursor(offset):
+    """
+    Cursor do item na posição `offset` (iniciando em 0) de uma connection.
+    O Bill (graphene) utiliza cursores no formato `arrayconnection:<offset>`,
+    o que permite iniciar a listagem em qualquer página sem percorrer as
+    anteriores.
+
+    param : offset : <int>
+
+    return : <str> : ou None para o início da connection.
+    """
+    if offset < 0:
+        return None
+    return b64encode(f'arrayconnection:{offset}'.encode('utf-8')).decode('utf-8')
+
+
+async def get_page(query, connection, page, page_size=BILL_PAGE_SIZE):
+    """
+    Retorna a página `page` (iniciando em 1) de uma connection do Bill com
+    uma única requisição, iniciando após o cursor do último item da página
+    anterior. A página seguinte já é requisitada, ficando disponível no
+    cache. Caso a página não exista, retorna uma página vazia.
+
+    param : query : <callable> : recebe `first` e `after` e retorna a query.
+    param : connection : <str> : nome da connection na resposta.
+    param : page : <int> : número da página.
+    param : page_size : <int> : quantidade de itens por página.
+
+    return : <Page>
+    """
+    if page < 1:
+        return Page(page, [], False)
+
+    after = offset_cursor((page - 1) * page_size - 1)
+    data = (await async_execute(query(first=page_size, after=after)))[connection]
+    page_info = data['pageInfo']
+
+    if page_info['hasNextPage']:
+        next_page = asyncio.ensure_future(
+            async_execute(query(first=page_size, after=page_info['endCursor']))
+        )
+        next_page.add_done_callback(_consume_result)
+
+    return build_page(page, data)
+
+
+def build_page(page, data):
+    """
+    Monta uma página a partir de uma connection retornada pelo Bill.
+
+    param : page : <int> : número da página.
+    param : data : <dict> : connection (edges e pageInfo).
+
+    return : <Page>
+    """
+    return Page(
+        page,
+        [edge['node'] for edge in data['edges']],
+        data['pageInfo']['hasNextPage']
+    )
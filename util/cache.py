@@ -0,0 +1,89 @@
+"""
+Módulo para cache em memória com expiração (TTL) e descarte LRU.
+"""
+from collections import OrderedDict
+from time import monotonic
+
+
+class TTLCache:
+    """
+    Cache em memória com tempo de vida por entrada e tamanho limitado.
+    Quando o limite é atingido a entrada usada há mais tempo é descartada.
+
+    Cada entrada pode receber tags, permitindo invalidar de uma só vez todas
+    as entradas relacionadas a um mesmo dado.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()  # chave -> (expira_em, valor, tags)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        entry = self._data.get(key)
+        return entry is not None and entry[0] > monotonic()
+
+    def get(self, key, default=None):
+        """
+        Retorna o valor da chave caso ainda esteja válido.
+
+        param : key : <hashable>
+        param : default : valor retornado quando a chave não está no cache.
+        """
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= monotonic():
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def get_stale(self, key, default=None):
+        """
+        Retorna o último valor armazenado para a chave, mesmo que já
+        expirado. Entradas invalidadas ou descartadas não são retornadas.
+
+        param : key : <hashable>
+        param : default : valor retornado quando a chave não está no cache.
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+
+        return entry[1]
+
+    def set(self, key, value, ttl, tags=()):
+        """
+        Armazena um valor por `ttl` segundos.
+
+        param : key : <hashable>
+        param : value : valor a ser armazenado.
+        param : ttl : <float> : tempo de vida em segundos.
+        param : tags : <iterable> : tags utilizadas na invalidação.
+        """
+        self._data[key] = (monotonic() + ttl, value, frozenset(tags))
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, *tags):
+        """
+        Remove todas as entradas marcadas com alguma das tags informadas.
+
+        return : <int> : quantidade de entradas removidas.
+        """
+        tags = set(tags)
+        keys = [key for key, entry in self._data.items() if entry[2] & tags]
+        for key in keys:
+            del self._data[key]
+
+        return len(keys)
+
+    def clear(self):
+        self._data.clear()
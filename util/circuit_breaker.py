@@ -0,0 +1,106 @@
+"""
+Módulo para proteção das chamadas a serviços externos (circuit breaker).
+
+Após uma sequência de falhas o circuito abre e as chamadas falham
+imediatamente, sem aguardar o timeout do serviço fora do ar. Passado o tempo
+de espera, uma única chamada de teste (half-open) é liberada: em caso de
+sucesso o circuito fecha, em caso de falha volta a abrir.
+"""
+from random import uniform
+from time import monotonic
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """
+    Chamada recusada porque o circuito do serviço está aberto.
+    """
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker de um serviço.
+
+    param : failure_threshold : <int> : falhas seguidas que abrem o circuito.
+    param : reset_timeout : <float> : segundos até liberar a chamada de teste.
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._probing = False
+
+    def allow(self):
+        """
+        Informa se uma chamada pode ser feita agora. Com o circuito aberto,
+        somente uma chamada de teste é liberada após `reset_timeout`.
+
+        return : <bool>
+        """
+        if self.state == CLOSED:
+            return True
+
+        if self.state == OPEN and monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = HALF_OPEN
+
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+
+        self.rejected += 1
+        return False
+
+    def release(self):
+        """
+        Libera a chamada de teste interrompida antes de terminar (ex:
+        cancelada), sem considerá-la um sucesso ou uma falha. A próxima
+        chamada passa a ser a chamada de teste.
+        """
+        self._probing = False
+
+    def record_success(self):
+        self.state = CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = OPEN
+            self.opened_at = monotonic()
+
+    def stats(self):
+        """
+        Retorna o estado atual do circuito.
+
+        return : <dict>
+        """
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            'rejected': self.rejected,
+        }
+
+
+def backoff_delay(attempt, base, cap):
+    """
+    Tempo de espera antes da nova tentativa: backoff exponencial com jitter
+    completo, evitando que várias chamadas tentem novamente ao mesmo tempo.
+
+    param : attempt : <int> : número da tentativa que falhou, iniciando em 0.
+    param : base : <float> : espera base em segundos.
+    param : cap : <float> : espera máxima em segundos.
+
+    return : <float>
+    """
+    return uniform(0, min(cap, base * 2 ** attempt))
@@ -2,6 +2,7 @@
 Módulo contendo dados específicos para o sistema de elos da ABP.
 """
 
+from bisect import bisect_right
 from enum import Enum
 
 
@@ -31,6 +32,42 @@ class Elos(Enum):
     graomestre = 7
 
 
+# pontuação mínima de cada elo
+ELO_MIN_POINTS = [
+    (Elos.retardatario, 0),
+    (Elos.bronze, 100),
+    (Elos.prata, 300),
+    (Elos.ouro, 500),
+    (Elos.platina, 750),
+    (Elos.diamante, 850),
+    (Elos.mestre, 950),
+    (Elos.graomestre, 1000),
+]
+
+# nome de exibição de cada elo
+ELO_DISPLAY_NAMES = {
+    Elos.retardatario: 'Retardatário',
+    Elos.bronze: 'Bronze',
+    Elos.prata: 'Prata',
+    Elos.ouro: 'Ouro',
+    Elos.platina: 'Platina',
+    Elos.diamante: 'Diamante',
+    Elos.mestre: 'Mestre',
+    Elos.graomestre: 'Grão Mestre',
+}
+
+_ELO_THRESHOLDS = [min_points for _, min_points in ELO_MIN_POINTS]
+
+
+def get_elo_by_points(points):
+    """
+    Retorna o elo correspondente à pontuação, segundo ELO_MIN_POINTS.
+    Pontuações negativas ficam no elo mais baixo.
+    """
+    position = bisect_right(_ELO_THRESHOLDS, points) - 1
+    return ELO_MIN_POINTS[max(position, 0)][0]
+
+
 def get_elo(elo_name):
     """
     Retorna um o elo solicitado.
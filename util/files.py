@@ -0,0 +1,20 @@
+"""
+Módulo para escrita de arquivos de estado em disco.
+"""
+import json
+import os
+
+
+def atomic_write_json(path, data):
+    """
+    Salva `data` em JSON em um arquivo temporário e o substitui de uma só vez,
+    para que uma interrupção não deixe o arquivo pela metade.
+
+    param : path : <str> : arquivo de destino.
+    param : data : dados serializáveis em JSON.
+    """
+    tmp_path = f'{path}.tmp'
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
@@ -2,18 +2,27 @@
 Módulo para ferramentas genéricas.
 """
 import difflib
+import unicodedata
 import discord
-from gql import gql, Client
-from gql.transport.requests import RequestsHTTPTransport
 from discord.utils import get
 from tabulate import tabulate
-from oauth2client.service_account import ServiceAccountCredentials
-from googleapiclient.discovery import build
-from settings import (RANKED_SPREADSHEET_ID, TRAINER_DB_SPREADSHEET_ID, SCORE_INDEX, SD_NAME_INDEX,
-                      COLOR_INDEX)
-from util.elos import (ELOS_MAP, get_elo_name)
+from settings import (RANKED_SPREADSHEET_ID, COLOR_INDEX, RANKED_REFRESH_INTERVAL,
+                      SHEETS_CHECK_REVISION, RANKED_SNAPSHOT_FILE, SHEETS_TIMEOUT)
+from util.elos import (ELOS_MAP, ELO_DISPLAY_NAMES, get_elo_name,
+                        get_elo_by_points)
+from util.leaderboard import Leaderboard
+from util.records import (RankedTrainer, DbTrainer, parse_ranked, parse_trainer_db,
+                          parse_rows)
+from util.single_flight import SingleFlight
+from util.snapshot import Snapshot, SnapshotFile, Fingerprinted
+from util.sheets import sheets_client, sheets_executor
 from random import randint
 
+
+# leituras de planilha em andamento
+sheets_flight = SingleFlight()
+
+
 def get_similar_pokemon(pokemon):
     """
     Identifica se o pokémon solicitado com nome errado
@@ -33,94 +42,162 @@ def get_similar_pokemon(pokemon):
 def get_trainer_rank(pts):
     """
     Retorna o rank (elo) do treinador baseado
-    na sua pontuação:
-    Retardatário 0 - 99
-    Bronze 100 - 299
-    Prata 300 - 499
-    Ouro 500 - 749
-    Platina 750 - 849
-    Diamante 850 - 949
-    Mestre 950- 999
-    Grão mestre 1000
-    """
-    pts = int(pts)
-    if pts < 100:
-        rank = 'Retardatário'
-    elif pts >= 100 and pts < 300:
-        rank = 'Bronze'
-    elif pts >= 300 and pts < 500:
-        rank = 'Prata'
-    elif pts >= 500 and pts < 750:
-        rank = 'Ouro'
-    elif pts >= 750 and pts < 850:
-        rank = 'Platina'
-    elif pts >= 850 and pts < 950:
-        rank = 'Diamante'
-    elif pts >= 950 and pts < 1000:
-        rank = 'Mestre'
-    elif pts >= 1000:
-        rank = 'Grão Mestre'
-    return rank
-
-
-def sort_trainers(data):
-    """
-    Ordena uma lista filtrada de trainers pelos pontos.
-
-    param : data : <list>
-    returns : <list>
-    """
-    trainers = []
-    for trainer in data:
-        try:
-            trainer_has_points = int(trainer[SCORE_INDEX])
-        except ValueError:
-            pass
-        else:
-            trainers.append(trainer)
-    return sorted(trainers, key=lambda i: int(i[SCORE_INDEX]), reverse=True)
-
-
-def get_ranked_spreadsheet():
-    """
-    Retorna os dados da planilha do ranked.
-    """
-    data = get_spreadsheet_data(RANKED_SPREADSHEET_ID, 'Rank!A1:F255')
-    return sort_trainers(data)
-
-
-def get_form_spreadsheet():
-    """
-    Retorna os dados de formulário da planilha do ranked.
-    """
-    data = get_spreadsheet_data(RANKED_SPREADSHEET_ID, 'Respostas ao formulário 2!A2:E255')
-    return data
-
-
-def get_spreadsheet_data(spreadsheet_id, cell_range):
-    scope = ['https://www.googleapis.com/auth/spreadsheets.readonly']
-    creds = ServiceAccountCredentials.from_json_keyfile_name(
-        'oak_ss_api_keys.json',
-        scope
+    na sua pontuação, segundo as faixas de pontos
+    de ELO_MIN_POINTS.
+    """
+    return ELO_DISPLAY_NAMES[get_elo_by_points(int(pts))]
+
+
+RANKED_RANGE = 'Rank!A1:F255'
+FORM_RANGE = 'Respostas ao formulário 2!A2:E255'
+TRAINER_DB_RANGE = 'Treinador-DB!B2:E255'
+
+# intervalos utilizados de cada planilha, lidos juntos em uma única requisição
+SPREADSHEET_RANGES = {
+    RANKED_SPREADSHEET_ID: [RANKED_RANGE, FORM_RANGE, TRAINER_DB_RANGE],
+}
+
+
+def get_spreadsheet_ranges(spreadsheet_id):
+    """
+    Retorna todos os intervalos registrados de uma planilha, lidos em uma
+    única requisição e portanto do mesmo momento.
+    Leituras simultâneas da mesma planilha compartilham a requisição.
+
+    param : spreadsheet_id : <str>
+
+    return : <dict> : valores de cada intervalo.
+    """
+    cell_ranges = tuple(SPREADSHEET_RANGES[spreadsheet_id])
+    return sheets_flight.do(
+        (spreadsheet_id, cell_ranges),
+        lambda: _fetch_spreadsheet_ranges(spreadsheet_id, cell_ranges)
     )
-    service = build('sheets', 'v4', credentials=creds)
-    sheet = service.spreadsheets()
 
-    result = sheet.values().get(
-        spreadsheetId=spreadsheet_id, range=cell_range
-    ).execute()
 
-    values = result.get('values', [])
+def _fetch_spreadsheet_ranges(spreadsheet_id, cell_ranges):
+    return sheets_client.batch_get(spreadsheet_id, cell_ranges)
+
+
+def get_spreadsheet_revision(spreadsheet_id):
+    """
+    Retorna a revisão atual da planilha, ou None quando a consulta está
+    desativada ou não está disponível.
+
+    param : spreadsheet_id : <str>
+
+    return : <str>
+    """
+    if not SHEETS_CHECK_REVISION:
+        return None
+    return _fetch_spreadsheet_revision(spreadsheet_id)
+
+
+def _fetch_spreadsheet_revision(spreadsheet_id):
+    return sheets_client.file_revision(spreadsheet_id)
+
+
+# intervalos da planilha do ranked, convertidos em registros somente quando
+# o seu conteúdo muda
+ranked_ranges = Fingerprinted({
+    RANKED_RANGE: parse_ranked,
+    FORM_RANGE: parse_rows,
+    TRAINER_DB_RANGE: parse_trainer_db,
+})
+
+
+def load_ranked_spreadsheets():
+    """
+    Busca os dados da planilha do ranked, com a aba Rank já ordenada pelos
+    pontos. Quando nenhum intervalo mudou, retorna os mesmos dados da
+    leitura anterior.
+    """
+    return ranked_ranges.update(get_spreadsheet_ranges(RANKED_SPREADSHEET_ID))
+
+
+def restore_ranked_spreadsheets(data):
+    """
+    Converte a cópia da planilha do ranked salva em disco de volta para
+    registros.
+    """
+    return {
+        RANKED_RANGE: [RankedTrainer._make(row) for row in data[RANKED_RANGE]],
+        FORM_RANGE: parse_rows(data[FORM_RANGE]),
+        TRAINER_DB_RANGE: [DbTrainer._make(row) for row in data[TRAINER_DB_RANGE]],
+    }
+
+
+# cópia em memória da planilha do ranked, também salva em disco
+ranked_snapshot = Snapshot(
+    load_ranked_spreadsheets,
+    RANKED_REFRESH_INTERVAL,
+    revision=lambda: get_spreadsheet_revision(RANKED_SPREADSHEET_ID),
+    store=SnapshotFile(RANKED_SNAPSHOT_FILE, restore=restore_ranked_spreadsheets),
+    executor=sheets_executor,
+    timeout=SHEETS_TIMEOUT
+)
+
+
+def _get_range(cell_range, data=None):
+    """
+    Retorna os registros de um intervalo da planilha do ranked. A lista é
+    compartilhada por todas as chamadas e não deve ser alterada.
+
+    param : data : <dict> : dados da planilha; por padrão a cópia em memória.
+    """
+    data = data if data is not None else ranked_snapshot.get()
+    return data[cell_range]
+
+
+def get_ranked_spreadsheet(data=None):
+    """
+    Retorna os treinadores da planilha do ranked (<RankedTrainer>), ordenados
+    pelos pontos.
+    """
+    return _get_range(RANKED_RANGE, data)
+
+
+def get_form_spreadsheet(data=None):
+    """
+    Retorna os dados de formulário da planilha do ranked (<tuple>).
+    """
+    return _get_range(FORM_RANGE, data)
+
 
-    return values
+def normalize_name(name):
+    """
+    Normaliza um nome para comparação: remove acentos (NFKD), espaços e
+    diferenças entre maiúsculas e minúsculas (casefold).
+
+    param : name : <str>
+
+    return : <str>
+    """
+    decomposed = unicodedata.normalize('NFKD', name)
+    name = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ''.join(name.casefold().split())
 
 
 def compare_insensitive(s1, s2):
-    # TODO: improve it to ignore all special characters
-    s1 = s1.strip().lower().replace("á", "a").replace("ã", "a").replace(" ", "")
-    s2 = s2.strip().lower().replace("á", "a").replace("ã", "a").replace(" ", "")
+    return normalize_name(s1) == normalize_name(s2)
+
 
-    return s1 == s2
+def build_name_index(rows, fields):
+    """
+    Monta um índice dos nomes normalizados para os registros de uma tabela.
+    Quando um nome se repete, prevalece o primeiro registro, como em uma
+    busca sequencial.
+
+    param : rows : <list> : registros da tabela.
+    param : fields : <list> : campos com os nomes.
+
+    return : <dict> : nome normalizado -> registro
+    """
+    index = {}
+    for row in rows:
+        for field in fields:
+            index.setdefault(normalize_name(getattr(row, field)), row)
+    return index
 
 
 def get_embed_output(ranked_table, client):
@@ -180,33 +257,26 @@ def get_table_output(table):
     return '```{}```'.format(response)
 
 
-def get_trainer_rank_row(trainer, position):
+def get_trainer_rank_row(trainer):
     """
-    Busca na planilha da Ranked a linha de dados contendo a informação
-    do treinador, retornando um vetor de dados atualizados do treinador.
+    Monta a linha do placar da Ranked com os dados do treinador, nas colunas
+    de `get_initial_ranked_table`.
 
-    param : trainer : <list> :
-    param : position : <int> :
+    param : trainer : <RankedTrainer> :
 
     return : <list> :
     """
-
-    # remove name and insert the position in the front
-    del trainer[0]
-    trainer.insert(0, position)
-
     # limit nick size...
-    trainer[1] = (trainer[1][:13] + '..') if len(trainer[1]) > 15 else trainer[1]
-
-    # remove losses and swap battles with points
-    del trainer[3]
-    trainer[3], trainer[4] = trainer[4], trainer[3]
-
-    # add rank
-    rank = get_trainer_rank(trainer[SCORE_INDEX])
-    trainer.append(rank)
+    nick = (trainer.nick[:13] + '..') if len(trainer.nick) > 15 else trainer.nick
 
-    return trainer
+    return [
+        trainer.pos,
+        nick,
+        trainer.wins,
+        trainer.battles,
+        trainer.points,
+        get_trainer_rank(trainer.points),
+    ]
 
 
 def get_initial_ranked_table():
@@ -222,6 +292,47 @@ def get_initial_ranked_table():
     ]
 
 
+def get_leaderboard():
+    """
+    Retorna o placar da Ranked, montado uma vez para cada versão dos dados.
+    O placar é compartilhado entre as chamadas e não deve ser alterado.
+
+    return : <Leaderboard>
+    """
+    return ranked_snapshot.derived(
+        'leaderboard',
+        lambda sheets: Leaderboard(sheets[RANKED_RANGE])
+    )
+
+
+def get_top_ranked_table():
+    """
+    Retorna a tabela dos 20 primeiros colocados da Ranked. A tabela é
+    montada uma vez para cada versão dos dados e não deve ser alterada.
+
+    return : <list> :
+    """
+    def build(data):
+        table = get_initial_ranked_table()
+        for trainer in get_leaderboard().top(20):
+            table.append(get_trainer_rank_row(trainer))
+        return table
+
+    return ranked_snapshot.derived('top_ranked_table', build)
+
+
+def get_top_ranked_output():
+    """
+    Retorna a tabela dos 20 primeiros colocados da Ranked já formatada.
+
+    return : <str> :
+    """
+    return ranked_snapshot.derived(
+        'top_ranked_output',
+        lambda data: get_table_output(get_top_ranked_table())
+    )
+
+
 def get_trainer_db_table():
     """
     Retorna uma lista contendo uma lista com as colunas a serem exibidas
@@ -235,30 +346,37 @@ def get_trainer_db_table():
     ]
 
 
-def find_trainer(trainer_nickname, data=None):
+def get_ranked_index(data=None):
     """
-    Procura por um treinador específico na tabela de treinadores da ranked.
+    Retorna o índice dos nicks da ranked. Sem `data`, o índice da cópia em
+    memória é montado uma vez para cada versão dos dados.
 
-    param : trainer_nickname : <str>
-    param : data : <list> : param data default value : None
+    param : data : <list> : treinadores da ranked.
 
-    return : <list>
+    return : <dict> : nick normalizado -> <RankedTrainer>
     """
-    data = data if data is not None else get_ranked_spreadsheet()
-    pos = 0
+    if data is not None:
+        return build_name_index(data, ['nick'])
 
-    for trainer in data:
-        pos += 1
-        trainer_found = compare_insensitive(
-            trainer[SD_NAME_INDEX],
-            trainer_nickname
-        )
+    return ranked_snapshot.derived(
+        'ranked_index',
+        lambda sheets: build_name_index(sheets[RANKED_RANGE], ['nick'])
+    )
 
-        if trainer_found:
-            trainer.append(pos)
-            return trainer
 
-    return None
+def find_trainer(trainer_nickname, data=None, index=None):
+    """
+    Procura por um treinador específico na tabela de treinadores da ranked.
+
+    param : trainer_nickname : <str>
+    param : data : <list> : param data default value : None
+    param : index : <dict> : índice montado com `get_ranked_index`, para
+                             várias buscas nos mesmos dados.
+
+    return : <RankedTrainer>
+    """
+    index = index if index is not None else get_ranked_index(data)
+    return index.get(normalize_name(trainer_nickname))
 
 
 def find_db_trainer(trainer_nickname, data=None):
@@ -268,25 +386,25 @@ def find_db_trainer(trainer_nickname, data=None):
     param : trainer_nickname : <str>
     param : data : <list> : param data default value : None
 
-    return : <list>
+    return : <DbTrainer>
     """
-    data = data if data is not None else get_trainer_database_spreadsheet()
-    for trainer in data:
-        comparer_values = [ trainer[0], trainer[1] ]
-        
-        for item in comparer_values:
-            trainer_found = compare_insensitive(item, trainer_nickname)
-            if trainer_found: 
-                return trainer
-    return None
+    if data is not None:
+        index = build_name_index(data, ['nick', 'discord'])
+    else:
+        index = ranked_snapshot.derived(
+            'trainer_db_index',
+            lambda sheets: build_name_index(sheets[TRAINER_DB_RANGE], ['nick', 'discord'])
+        )
+
+    return index.get(normalize_name(trainer_nickname))
 
 
-def get_trainer_database_spreadsheet():
+def get_trainer_database_spreadsheet(data=None):
     """
-    Retorna os dados da planilha do banco de dados de treinadores da ABP.
+    Retorna os treinadores (<DbTrainer>) da planilha do banco de dados de
+    treinadores da ABP.
     """
-    data = get_spreadsheet_data(RANKED_SPREADSHEET_ID, 'Treinador-DB!B2:E255')
-    return data
+    return _get_range(TRAINER_DB_RANGE, data)
 
 
 def get_discord_member(client, member_name):
@@ -324,28 +442,6 @@ def get_value_or_default(data, pos=None, default_value = "-"):
         default_value
 
 
-def get_gql_client(url, auth=None):
-    """
-    Retorna um client de execução de requisições graphql para acesso ao Bill.
-    param : auth : <str> : hash de autorização.
-    """
-    if not auth:
-        transport = RequestsHTTPTransport(url=url, use_json=True)
-    else:
-        headers = {
-            'content-type': 'application/json',
-            'auth': '{}'.format(auth)
-        }
-        transport = RequestsHTTPTransport(
-            url=url,
-            use_json=True,
-            headers=headers
-    )
-
-    client = Client(transport=transport, fetch_schema_from_transport=False)
-    return client
-
-
 def get_badge_icon(badge_name):
     """
     Retorna a url da imagem contendo o ícone do tipo da insígnia designada.
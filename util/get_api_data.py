@@ -1,33 +1,25 @@
+import asyncio
 import requests
 import json
-from settings import (POKE_API_URL, EFFECTIVENESS_API_URL, ITEM_API_URL,
-                    ABILITY_API_URL)
-
-def get_immunities(pokemon_types):
-    '''
-    Determina se um pokémon é imune à um determinado
-    tipo.
-
-    param : pokemon_types : <list> : Tipos do pokémon
-    return : <list>
-    '''
-    immunities = []
-    if 'ghost' in pokemon_types:
-        immunities.append('fighting')
-        immunities.append('normal')
-    if 'dark' in pokemon_types:
-        immunities.append('psychic')
-    if 'fairy' in pokemon_types:
-        immunities.append('dragon')
-    if 'steel' in pokemon_types:
-        immunities.append('poison')
-    if 'flying' in pokemon_types:
-        immunities.append('ground')
-    if 'normal' in pokemon_types:
-        immunities.append('ghost')
-    if 'ground' in pokemon_types:
-        immunities.append('electric')
-    return immunities
+from functools import lru_cache
+from settings import (POKE_API_URL, ITEM_API_URL, ABILITY_API_URL,
+                    POKEAPI_CACHE_FILE, POKEAPI_CACHE_MAX_AGE,
+                    POKEAPI_NEGATIVE_TTL, POKEDEX_FILE)
+from util.api_cache import ApiCache
+from util.pokeapi_client import pokeapi_client
+from util.pokedex import Pokedex
+from util.type_chart import type_effectiveness, precompute_effectiveness
+
+
+# respostas da PokeAPI salvas em disco
+pokeapi_cache = ApiCache(
+    POKEAPI_CACHE_FILE,
+    max_age=POKEAPI_CACHE_MAX_AGE,
+    negative_ttl=POKEAPI_NEGATIVE_TTL
+)
+
+# pokedex local, gerada com `python -m util.pokedex`
+pokedex = Pokedex(POKEDEX_FILE)
 
 def validate(response):
     '''
@@ -41,7 +33,58 @@ def validate(response):
         return data
     return {}
 
+def get_cached_resource(kind, base_url, name):
+    '''
+    Retorna um recurso da Poke API, buscando-o somente quando não estiver
+    no cache em disco. Nomes inexistentes (404) também ficam no cache.
+
+    param : kind : <str> : tipo do recurso (pokemon, item, ability)
+    param : base_url : <str> : url do recurso na Poke API
+    param : name : <str> : nome do recurso
+    return : <dict>
+    '''
+    def load(resource_name):
+        response = requests.get(base_url + resource_name + '/')
+        if response.status_code == 404:
+            return {}
+        if response.status_code != 200:
+            # falha temporária, não salva no cache
+            return None
+        return validate(response)
+
+    return pokeapi_cache.fetch(kind, name.strip().lower(), load)
+
+async def async_get_cached_resource(kind, base_url, name):
+    '''
+    Versão assíncrona de `get_cached_resource`, para uso nos comandos.
+    A busca é feita pelo client assíncrono da Poke API, sem bloquear o
+    event loop.
+
+    param : kind : <str> : tipo do recurso (pokemon, item, ability)
+    param : base_url : <str> : url do recurso na Poke API
+    param : name : <str> : nome do recurso
+    return : <dict>
+    '''
+    async def load(resource_name):
+        return await pokeapi_client.get(base_url + resource_name + '/')
+
+    return await pokeapi_cache.async_fetch(kind, name.strip().lower(), load)
+
 def get_pokemon_data(pokemon):
+    '''
+    Busca pelos dados de um pokémon fornecido como
+    parâmetro na pokedex local, recorrendo à Poke API
+    somente quando ele não estiver na pokedex.
+
+    param : pokemon : <str> : Nome do pokémon
+    return : <dict>
+    '''
+    data = pokedex.get(pokemon)
+    if data is not None:
+        return data
+    return fetch_pokemon_data(pokemon)
+
+def fetch_pokemon_data(pokemon):
     '''
     Faz uma requisição à Poke API buscando
     pelos dados de um pokémon fornecido como
@@ -50,34 +93,67 @@ def get_pokemon_data(pokemon):
     param : pokemon : <str> : Nome do pokémon
     return : <dict>
     '''
-    url = POKE_API_URL + pokemon + '/'
-    response = requests.get(url)
-    return validate(response)
+    return get_cached_resource('pokemon', POKE_API_URL, pokemon)
 
-def get_pokemon_effectiveness(dex_num):
+async def async_get_pokemon_data(pokemon):
     '''
-    Faz uma requisição web buscando
-    pelos dados de efetividade do pokemon pelo
-    seu id (número na pokedex).
-    A efetividade contempla:
-    - Fraquezas
-    - Resistência
-    - Imunidade
+    Versão assíncrona de `get_pokemon_data`. A pokedex local
+    é carregada em uma thread na primeira consulta.
 
-    param : dex_num : <int> Número do pokémon na PokeDex
+    param : pokemon : <str> : Nome do pokémon
     return : <dict>
     '''
-    response = requests.get(EFFECTIVENESS_API_URL)
-    data = validate(response)
-    # a resposta da requsição retorna uma lista
-    # por iniciar do zero chamamos o pokémon pelo
-    # ID - 1
-    try:
-        effectivness = data[dex_num - 1]
-    except:
-        effectivness = {}
+    if pokedex.pokemon is None:
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, pokedex_effectiveness)
+
+    data = pokedex.get(pokemon)
+    if data is not None:
+        return data
+    return await async_fetch_pokemon_data(pokemon)
 
-    return effectivness
+async def async_fetch_pokemon_data(pokemon):
+    '''
+    Versão assíncrona de `fetch_pokemon_data`.
+
+    param : pokemon : <str> : Nome do pokémon
+    return : <dict>
+    '''
+    return await async_get_cached_resource('pokemon', POKE_API_URL, pokemon)
+
+async def async_fetch_many_pokemon(pokemon_names):
+    '''
+    Busca os dados de vários pokémons ao mesmo tempo, limitado
+    pelas conexões por host do client da Poke API.
+
+    param : pokemon_names : <list> : Nomes dos pokémons
+    return : <dict> : nome do pokémon -> dados
+    '''
+    results = await asyncio.gather(
+        *[async_fetch_pokemon_data(name) for name in pokemon_names]
+    )
+    return dict(zip(pokemon_names, results))
+
+def get_pokemon_types(data):
+    '''
+    Retorna os tipos de um pokémon a partir dos seus dados.
+
+    param : data : <dict> : dados do pokémon na Poke API
+    return : <list>
+    '''
+    return [t['type']['name'] for t in data.get('types', [])]
+
+@lru_cache(maxsize=1)
+def pokedex_effectiveness():
+    '''
+    Calcula, em uma única operação da tabela de tipos, as
+    efetividades de todos os pokémons da pokedex local, a
+    partir dos tipos salvos nela, sem consultar a Poke API.
+    A tabela é calculada uma única vez.
+
+    return : <dict> : nome do pokémon -> {tipo de ataque: multiplicador}
+    '''
+    return precompute_effectiveness(pokedex.all_types())
 
 def get_item_data(item_name):
     '''
@@ -88,9 +164,7 @@ def get_item_data(item_name):
 
     return : <dict>
     '''
-    url = ITEM_API_URL + item_name + '/'
-    response = requests.get(url)
-    return validate(response)
+    return get_cached_resource('item', ITEM_API_URL, item_name)
 
 def get_ability_data(ability_name):
     '''
@@ -100,27 +174,44 @@ def get_ability_data(ability_name):
     param : ability_name : <str> : Nome da habilidade
     return : <dict>
     '''
-    url = ABILITY_API_URL + ability_name + '/'
-    response = requests.get(url)
-    return validate(response)
+    return get_cached_resource('ability', ABILITY_API_URL, ability_name)
 
-def parse_effectiveness(data):
+def format_multiplier(poke_type, multiplier):
     '''
-    Realiza um parsing em um dicionário contendo as
-    efetividades de um pokémon.
+    Formata um tipo de ataque, destacando os multiplicadores
+    diferentes de 2x e ½x.
 
-    param : data : <dict> : Dados de efetividade do pokémon
+    param : poke_type : <str> : tipo de ataque
+    param : multiplier : <float> : multiplicador de dano
     return : <str>
     '''
-    if not data:
+    if multiplier == 4:
+        return '{} (4x)'.format(poke_type)
+    if multiplier == 0.25:
+        return '{} (¼x)'.format(poke_type)
+    return poke_type
+
+def parse_effectiveness(effectiveness):
+    '''
+    Realiza um parsing em um dicionário contendo os
+    multiplicadores de dano de cada tipo de ataque
+    contra um pokémon.
+
+    param : effectiveness : <dict> : tipo de ataque -> multiplicador
+    return : <str>
+    '''
+    if not effectiveness:
         response = 'Dados de efetividade desconhecidos!'
     else:
-        weakness = ', '.join(w for w in data.get('weaknesses'))
-        resistance = ', '.join(r for r in data.get('strengths'))
-
-        # Como a requisição não apresenta as imunidades
-        # tenho que fazer isso 'na mão'
-        immunities = ', '.join(i for i in get_immunities(data.get('types')))
+        weakness = ', '.join(
+            format_multiplier(t, m) for t, m in effectiveness.items() if m > 1
+        )
+        resistance = ', '.join(
+            format_multiplier(t, m) for t, m in effectiveness.items() if 0 < m < 1
+        )
+        immunities = ', '.join(
+            t for t, m in effectiveness.items() if m == 0
+        )
 
         # monta a string com os dados
         response = 'Weakness: {}\nResistance: {}\nImmune: {}'.format(
@@ -148,7 +239,8 @@ def dex_information(data):
         picture = data['sprites'].get('front_default')
         height = data.get('height')
         weight = data.get('weight')
-        types = ', '.join(t['type']['name'] for t in data.get('types'))
+        pokemon_types = get_pokemon_types(data)
+        types = ', '.join(pokemon_types)
 
         # monta um dicionário de stats a partir dos dados da requisição
         stats = [{i['stat']['name']:i['base_stat']} for i in data.get('stats')]
@@ -158,8 +250,12 @@ def dex_information(data):
             '{} :{}'.format(k,v) for i in stats for (k, v) in i.items()
         )
 
-        # define as efetividades do pokémon
-        effectiveness = parse_effectiveness(get_pokemon_effectiveness(dex_num))
+        # define as efetividades do pokémon, pré-calculadas para os
+        # pokémons da pokedex local
+        effectiveness = pokedex_effectiveness().get(name)
+        if effectiveness is None:
+            effectiveness = type_effectiveness(pokemon_types)
+        effectiveness = parse_effectiveness(effectiveness)
 
         # monta a string de resposta
         response = 'Name: {}\nPokedex: {}\nType: {}\nHeight: {} Weight: {}\n'.format(
@@ -0,0 +1,88 @@
+"""
+Módulo para o placar da Ranked.
+
+O placar é montado uma vez para cada versão dos dados da ranked. Como as
+linhas já estão ordenadas pelos pontos e cada elo corresponde a uma faixa de
+pontos, os treinadores de um elo ocupam um trecho contínuo do placar,
+localizado por busca binária. Consultas do top N e de cada elo são apenas
+fatias da lista.
+"""
+from bisect import bisect_right
+from math import ceil
+
+from util.elos import ELO_MIN_POINTS
+
+
+class Leaderboard:
+    """
+    Placar da ranked.
+
+    param : rows : <list> : treinadores da ranked (<RankedTrainer>) ordenados
+                            pelos pontos, da maior para a menor pontuação.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        # pontuações negativas, em ordem crescente, para a busca binária
+        scores = [-row.points for row in rows]
+
+        self.buckets = {}
+        lowest_elo = ELO_MIN_POINTS[0][0]
+        upper = None
+        for elo, min_points in reversed(ELO_MIN_POINTS):
+            start = 0 if upper is None else bisect_right(scores, -upper)
+            # pontuações negativas também ficam no elo mais baixo
+            end = len(scores) if elo == lowest_elo else bisect_right(scores, -min_points)
+            self.buckets[elo] = (start, end)
+            upper = min_points
+
+    def __len__(self):
+        return len(self.rows)
+
+    def top(self, n):
+        """
+        Retorna os `n` primeiros colocados.
+
+        param : n : <int>
+
+        return : <list> : <RankedTrainer>
+        """
+        return self.rows[:n]
+
+    def elo_count(self, elo):
+        """
+        Quantidade de treinadores no elo.
+
+        param : elo : <Elos>
+
+        return : <int>
+        """
+        start, end = self.buckets[elo]
+        return end - start
+
+    def elo_pages(self, elo, page_size):
+        """
+        Quantidade de páginas da listagem do elo.
+
+        param : elo : <Elos>
+        param : page_size : <int>
+
+        return : <int>
+        """
+        return ceil(self.elo_count(elo) / page_size)
+
+    def elo_page(self, elo, page=1, page_size=20):
+        """
+        Retorna uma página dos treinadores do elo, na ordem do placar.
+
+        param : elo : <Elos>
+        param : page : <int> : página, iniciando em 1.
+        param : page_size : <int>
+
+        return : <list> : <RankedTrainer>
+        """
+        start, end = self.buckets[elo]
+        first = start + (page - 1) * page_size
+        if page < 1 or first >= end:
+            return []
+        return self.rows[first:min(first + page_size, end)]
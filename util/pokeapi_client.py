@@ -0,0 +1,112 @@
+"""
+Módulo para o client assíncrono da PokeAPI.
+
+As requisições são feitas no próprio event loop do discord com o aiohttp,
+sem ocupar threads. Uma única sessão é compartilhada por todos os comandos,
+mantendo um pool de conexões keep-alive limitado no total e por host, e cada
+requisição tem o prazo de `POKEAPI_TIMEOUT` segundos.
+
+Requisições independentes são feitas ao mesmo tempo com `get_many`, de modo
+que o tempo total é o da requisição mais lenta e não a soma de todas.
+Requisições simultâneas para a mesma url compartilham uma única requisição.
+"""
+import asyncio
+
+import aiohttp
+
+from settings import POKEAPI_POOL_SIZE, POKEAPI_PER_HOST, POKEAPI_TIMEOUT
+from util.single_flight import SingleFlight
+
+
+class PokeApiClient:
+    """
+    Client compartilhado da PokeAPI.
+
+    A sessão é criada na primeira requisição, dentro do event loop em que
+    será utilizada.
+
+    param : pool_size : <int> : máximo de conexões abertas.
+    param : per_host : <int> : máximo de conexões simultâneas com um mesmo host.
+    param : timeout : <float> : prazo de cada requisição em segundos.
+    """
+
+    def __init__(self, pool_size, per_host, timeout):
+        self.pool_size = pool_size
+        self.per_host = per_host
+        self.timeout = timeout
+        self.session = None
+        self.flight = SingleFlight()
+        self.requests = 0
+        self.failures = 0
+
+    def _session(self):
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.per_host,
+                ttl_dns_cache=300
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                raise_for_status=False
+            )
+        return self.session
+
+    async def _get(self, url):
+        self.requests += 1
+        try:
+            async with self._session().get(url) as response:
+                if response.status == 404:
+                    return {}
+                if response.status != 200:
+                    self.failures += 1
+                    return None
+                return await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            self.failures += 1
+            return None
+
+    async def get(self, url):
+        """
+        Busca um recurso da PokeAPI.
+
+        param : url : <str>
+
+        return : <dict> : dados do recurso, {} para um recurso inexistente
+                          (404) ou None para uma falha temporária.
+        """
+        return await self.flight.async_do(url, lambda: self._get(url))
+
+    async def get_many(self, urls):
+        """
+        Busca vários recursos ao mesmo tempo, respeitando os limites do pool.
+
+        param : urls : <list>
+
+        return : <list> : resultado de `get` para cada url, na mesma ordem.
+        """
+        return await asyncio.gather(*[self.get(url) for url in urls])
+
+    def stats(self):
+        """
+        Retorna os contadores de requisições.
+
+        return : <dict>
+        """
+        return {
+            'requests': self.requests,
+            'failures': self.failures,
+            'coalesced': self.flight.coalesced,
+        }
+
+    async def close(self):
+        """
+        Encerra as conexões da sessão compartilhada.
+        """
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+
+pokeapi_client = PokeApiClient(POKEAPI_POOL_SIZE, POKEAPI_PER_HOST, POKEAPI_TIMEOUT)
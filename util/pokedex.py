@@ -0,0 +1,233 @@
+"""
+Módulo para a pokedex local.
+
+Os campos utilizados por `dex_information` (nome, número, sprite, altura,
+peso, tipos e stats base) de todos os pokémons de files/pokes.txt são
+exportados da Poke API para um arquivo JSON versionado, gerado antes do
+deploy:
+
+    python -m util.pokedex
+
+Os pokémons são buscados ao mesmo tempo, limitados pelas conexões por host
+do client assíncrono da Poke API.
+
+O bot carrega o arquivo uma única vez, na primeira consulta, e só recorre à
+Poke API para os pokémons que não estiverem nele.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import threading
+from datetime import datetime
+from sys import stdout
+
+from settings import POKEDEX_FILE
+from util.files import atomic_write_json
+
+
+DATASET_VERSION = 1
+
+# campos de cada pokémon no arquivo, nesta ordem
+FIELDS = ['id', 'name', 'sprite', 'height', 'weight', 'types', 'stats']
+
+
+def compact_pokemon(data):
+    """
+    Extrai dos dados da Poke API somente os campos da pokedex local.
+
+    param : data : <dict> : dados do pokémon na Poke API.
+
+    return : <list> : valores na ordem de FIELDS.
+    """
+    return [
+        data['id'],
+        data['name'],
+        data['sprites'].get('front_default'),
+        data['height'],
+        data['weight'],
+        [t['type']['name'] for t in data['types']],
+        [[s['stat']['name'], s['base_stat']] for s in data['stats']],
+    ]
+
+
+def expand_pokemon(values):
+    """
+    Converte um pokémon da pokedex local para o formato da Poke API
+    utilizado por `dex_information`.
+
+    param : values : <list> : valores na ordem de FIELDS.
+
+    return : <dict>
+    """
+    entry = dict(zip(FIELDS, values))
+    return {
+        'id': entry['id'],
+        'name': entry['name'],
+        'sprites': {'front_default': entry['sprite']},
+        'height': entry['height'],
+        'weight': entry['weight'],
+        'types': [
+            {'slot': slot, 'type': {'name': poke_type}}
+            for slot, poke_type in enumerate(entry['types'], start=1)
+        ],
+        'stats': [
+            {'base_stat': base_stat, 'stat': {'name': stat}}
+            for stat, base_stat in entry['stats']
+        ],
+    }
+
+
+class Pokedex:
+    """
+    Pokedex local, carregada na primeira consulta.
+
+    param : path : <str> : arquivo gerado por `export_pokedex`.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.pokemon = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        Carrega o arquivo. Caso não exista ou seja de outra versão, a
+        pokedex fica vazia e todas as consultas recorrem à Poke API.
+
+        return : <dict> : nome -> valores na ordem de FIELDS.
+        """
+        with self._lock:
+            if self.pokemon is not None:
+                return self.pokemon
+
+            pokemon = {}
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    dataset = json.load(f)
+            except (OSError, ValueError) as err:
+                stdout.write(
+                    f'Aviso: pokedex local indisponível ({err}); os pokémons '
+                    'serão buscados na Poke API. Gere-a com `python -m util.pokedex`\n'
+                )
+                dataset = {}
+
+            if dataset.get('version') == DATASET_VERSION and dataset.get('fields') == FIELDS:
+                pokemon = dataset['pokemon']
+            elif dataset:
+                stdout.write(
+                    f'Aviso: pokedex local {self.path} é de outra versão; os '
+                    'pokémons serão buscados na Poke API. Gere-a novamente com '
+                    '`python -m util.pokedex`\n'
+                )
+
+            self.pokemon = pokemon
+
+        return self.pokemon
+
+    def get(self, name):
+        """
+        Retorna os dados do pokémon no formato da Poke API.
+
+        param : name : <str>
+
+        return : <dict> : ou None quando o pokémon não está na pokedex.
+        """
+        values = self.load().get(name.strip().lower())
+        if values is None:
+            return None
+        return expand_pokemon(values)
+
+    def all_types(self):
+        """
+        Retorna os tipos de todos os pokémons da pokedex.
+
+        return : <dict> : nome -> tipos.
+        """
+        types_field = FIELDS.index('types')
+        return {name: values[types_field] for name, values in self.load().items()}
+
+
+def export_pokedex(names, fetch, path):
+    """
+    Busca os pokémons e salva a pokedex local.
+
+    param : names : <list> : nomes dos pokémons.
+    param : fetch : <callable> : recebe o nome e retorna os dados da Poke API.
+    param : path : <str> : arquivo da pokedex.
+
+    return : <list> : nomes não encontrados. Caso nenhum seja encontrado, o
+                      arquivo não é alterado.
+    """
+    pokemon = {}
+    missing = []
+    for name in names:
+        data = fetch(name)
+        if data:
+            pokemon[name] = compact_pokemon(data)
+        else:
+            missing.append(name)
+
+    if not pokemon:
+        # mantém a pokedex anterior quando a Poke API está inacessível
+        return missing
+
+    dataset = {
+        'version': DATASET_VERSION,
+        'generated_at': datetime.utcnow().isoformat(),
+        'fields': FIELDS,
+        'pokemon': pokemon,
+    }
+
+    atomic_write_json(path, dataset)
+
+    return missing
+
+
+async def fetch_pokedex(names):
+    """
+    Busca todos os pokémons ao mesmo tempo pelo client assíncrono da
+    Poke API, encerrando as conexões ao final.
+
+    param : names : <list> : nomes dos pokémons.
+
+    return : <dict> : nome -> dados da Poke API.
+    """
+    from util.get_api_data import async_fetch_many_pokemon
+    from util.pokeapi_client import pokeapi_client
+
+    try:
+        return await async_fetch_many_pokemon(names)
+    finally:
+        await pokeapi_client.close()
+
+
+def main():
+
+    arg_parser = argparse.ArgumentParser(
+        description='Exporta a pokedex local a partir da Poke API.'
+    )
+    arg_parser.add_argument('--names', default='files/pokes.txt',
+                            help='arquivo com um nome de pokémon por linha')
+    arg_parser.add_argument('--output', default=POKEDEX_FILE,
+                            help='arquivo da pokedex')
+    args = arg_parser.parse_args()
+
+    with open(args.names, 'r', encoding='utf-8') as f:
+        names = [line.strip().lower() for line in f if line.strip()]
+
+    loop = asyncio.get_event_loop()
+    fetched = loop.run_until_complete(fetch_pokedex(names))
+    missing = export_pokedex(names, fetched.get, args.output)
+
+    stdout.write(f'{len(names) - len(missing)} pokémons salvos em {args.output}\n')
+    if missing:
+        stdout.write(f'Não encontrados: {", ".join(missing)}\n')
+
+    # sem nenhum pokémon a pokedex não serve para nada: falha o build
+    if len(missing) == len(names):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+"""
+Módulo para validação das batalhas registradas no formulário da Ranked.
+
+O resultado de cada linha do formulário é salvo em disco junto com a
+assinatura (hash) do conteúdo validado e a última linha validada. A cada
+execução somente as linhas novas ou editadas são validadas novamente; as
+demais reaproveitam o resultado salvo, de forma que os erros pendentes
+continuam sendo reportados sem baixar os replays de novo.
+"""
+import hashlib
+import json
+from datetime import datetime
+
+from settings import RANKED_VALIDATION_FILE
+from util.elos import get_elo_by_points, validate_elo_battle
+from util.files import atomic_write_json
+from util.general_tools import find_trainer, get_ranked_index
+from util.showdown_battle import load_battle_replay
+
+
+# incrementar ao alterar as regras de validação invalida os resultados salvos
+STATE_VERSION = 1
+REPLAY_ERROR = 'Não foi possivel carregar o replay'
+
+
+def row_hash(row):
+    """
+    Assinatura do conteúdo de uma linha do formulário.
+
+    param : row : <list>
+
+    return : <str>
+    """
+    content = '\x1f'.join(str(value) for value in row)
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def validate_form_row(row, ranked_index):
+    """
+    Valida uma batalha do formulário: os treinadores devem estar na ranked,
+    os elos devem poder se enfrentar e o replay deve conferir com o registro.
+
+    param : row : <tuple> : linha do formulário.
+    param : ranked_index : <dict> : índice dos nicks da ranked.
+
+    return : <tuple> : erros encontrados e se a linha deve ser validada
+                       novamente na próxima execução (treinador não
+                       encontrado ou replay indisponível).
+    """
+    errors = []
+
+    # validate trainers
+    trainers_result = ""
+    winner_data = find_trainer(row[2], index=ranked_index)
+    loser_data = find_trainer(row[3], index=ranked_index)
+
+    if not winner_data:
+        trainers_result += "Winner not found; "
+
+    if not loser_data:
+        trainers_result += "Loser not found; "
+
+    if trainers_result:
+        # sem os treinadores não há como validar elos e replay; a linha é
+        # validada novamente quando o treinador for cadastrado na ranked
+        return [trainers_result], True
+
+    # validate elos
+    winner_elo = get_elo_by_points(winner_data.points)
+    loser_elo = get_elo_by_points(loser_data.points)
+    valid_elos = validate_elo_battle(winner_elo, loser_elo)
+
+    if not valid_elos:
+        errors.append(f"Invalid elos matchup ({winner_elo.name} vs {loser_elo.name})")
+
+    # validate showdown replay
+    result = load_battle_replay(row[4])  # 4 is the replay
+
+    if not result.success:
+        errors.append(REPLAY_ERROR)
+        return errors, True
+
+    # validate replay metadata
+    battle_result = result.battle.validate(
+        row[2],
+        row[3],
+        datetime.strptime(row[0], "%d/%m/%Y %H:%M:%S")
+    )
+
+    if not battle_result.success:
+        errors.append(battle_result.error)
+
+    return errors, False
+
+
+class ValidationState:
+    """
+    Resultado da validação de cada linha do formulário, salvo em disco.
+
+    param : path : <str> : arquivo JSON onde o estado é salvo.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.watermark = 1  # última linha validada (a linha 1 é o cabeçalho)
+        self.rows = {}  # linha -> {'hash', 'errors', 'retry'}
+        self.loaded = False
+
+    def load(self):
+        """
+        Carrega o estado salvo. Arquivos ausentes, corrompidos ou de outra
+        versão resultam em uma validação completa.
+        """
+        self.loaded = True
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if state.get('version') != STATE_VERSION:
+            return
+
+        self.watermark = state['watermark']
+        self.rows = {int(line): result for line, result in state['rows'].items()}
+
+    def save(self):
+        """
+        Salva o estado em disco.
+        """
+        state = {
+            'version': STATE_VERSION,
+            'watermark': self.watermark,
+            'rows': self.rows,
+        }
+        atomic_write_json(self.path, state)
+
+    def reset(self):
+        """
+        Descarta os resultados salvos, forçando a validação de todas as linhas.
+        """
+        self.watermark = 1
+        self.rows = {}
+        self.loaded = True
+
+    def is_current(self, line, digest):
+        """
+        Informa se a linha já foi validada com este mesmo conteúdo.
+        """
+        result = self.rows.get(line)
+        return (
+            line <= self.watermark
+            and result is not None
+            and result['hash'] == digest
+            and not result['retry']
+        )
+
+
+validation_state = ValidationState(RANKED_VALIDATION_FILE)
+
+
+def validate_form(form_data, ranked_data, state=validation_state):
+    """
+    Valida as linhas novas ou editadas do formulário e retorna os erros de
+    todas as linhas, inclusive os já conhecidos.
+
+    param : form_data : <list> : linhas do formulário, a partir da linha 2.
+    param : ranked_data : <list> : dados da ranked.
+    param : state : <ValidationState>
+
+    return : <tuple> : erros pendentes ([linha, erro]) e quantidade de linhas
+                       validadas nesta execução.
+    """
+    if not state.loaded:
+        state.load()
+
+    ranked_index = get_ranked_index(ranked_data)
+    rows = {}
+    validated = 0
+    try:
+        for line, row in enumerate(form_data, start=2):
+            digest = row_hash(row)
+            if state.is_current(line, digest):
+                rows[line] = state.rows[line]
+                continue
+
+            errors, retry = validate_form_row(row, ranked_index)
+            rows[line] = {'hash': digest, 'errors': errors, 'retry': retry}
+            validated += 1
+    finally:
+        # mantém o progresso mesmo que a validação seja interrompida
+        if validated:
+            state.rows.update(rows)
+            state.watermark = max(state.watermark, max(rows))
+            state.save()
+
+    # linhas removidas do formulário deixam de ser reportadas
+    total = len(form_data) + 1
+    for line in [line for line in state.rows if line > total]:
+        del state.rows[line]
+    if state.watermark > total:
+        state.watermark = total
+        state.save()
+
+    pending = [
+        [line, error]
+        for line, result in sorted(rows.items())
+        for error in result['errors']
+    ]
+
+    return pending, validated
@@ -0,0 +1,92 @@
+"""
+Módulo para os registros das linhas das planilhas.
+
+As linhas são convertidas uma única vez, na leitura da planilha, em registros
+imutáveis (namedtuple, sem __dict__ por instância) com os campos numéricos já
+convertidos. Os mesmos registros são compartilhados por todos os comandos,
+sem cópias; quem precisa de outro formato monta uma nova lista a partir deles.
+"""
+from collections import namedtuple
+
+from settings import SCORE_INDEX, SD_NAME_INDEX
+
+
+# treinador da aba Rank, com a posição no placar
+RankedTrainer = namedtuple(
+    'RankedTrainer',
+    ['pos', 'name', 'nick', 'wins', 'losses', 'points', 'battles']
+)
+
+# treinador da aba Treinador-DB
+DbTrainer = namedtuple('DbTrainer', ['nick', 'discord', 'switch_fc', 'showdown'])
+
+
+def _cell(row, index, default=''):
+    return row[index] if index < len(row) else default
+
+
+def _to_int(value, default=0):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def parse_ranked(rows):
+    """
+    Converte as linhas da aba Rank em registros ordenados pelos pontos, da
+    maior para a menor pontuação. Linhas sem pontuação, como o cabeçalho,
+    são descartadas.
+
+    param : rows : <list> : linhas da planilha.
+
+    return : <list> : <RankedTrainer>
+    """
+    trainers = []
+    for row in rows:
+        try:
+            points = int(_cell(row, SCORE_INDEX))
+        except ValueError:
+            continue
+        trainers.append((points, row))
+
+    trainers.sort(key=lambda trainer: trainer[0], reverse=True)
+
+    return [
+        RankedTrainer(
+            pos=pos,
+            name=_cell(row, 0),
+            nick=_cell(row, SD_NAME_INDEX),
+            wins=_to_int(_cell(row, 2)),
+            losses=_to_int(_cell(row, 3)),
+            points=points,
+            battles=_to_int(_cell(row, 5)),
+        )
+        for pos, (points, row) in enumerate(trainers, start=1)
+    ]
+
+
+def parse_trainer_db(rows):
+    """
+    Converte as linhas da aba Treinador-DB em registros. Células vazias no
+    final da linha, omitidas pela API, ficam em branco.
+
+    param : rows : <list> : linhas da planilha.
+
+    return : <list> : <DbTrainer>
+    """
+    return [
+        DbTrainer(*(_cell(row, i) for i in range(len(DbTrainer._fields))))
+        for row in rows
+    ]
+
+
+def parse_rows(rows):
+    """
+    Converte as linhas de uma aba sem registro próprio em tuplas.
+
+    param : rows : <list> : linhas da planilha.
+
+    return : <list> : <tuple>
+    """
+    return [tuple(row) for row in rows]
@@ -0,0 +1,221 @@
+"""
+Módulo para o client da API do Google Sheets.
+
+As credenciais e o serviço são construídos uma única vez e compartilhados por
+todas as leituras de planilha. O serviço é construído a partir do documento
+de discovery salvo em disco, sem consultar a rede na inicialização, e o token
+de acesso é renovado antes de expirar, evitando leituras recusadas por token
+vencido.
+
+As leituras são feitas no pool de threads dedicado ao Sheets, fora do event
+loop do Discord. O tamanho do pool limita quantas chamadas ao Google são
+feitas ao mesmo tempo, e cada conexão tem o prazo de `SHEETS_TIMEOUT`.
+
+A revisão de cada planilha pode ser consultada nos metadados do Google Drive,
+permitindo saber se houve alteração sem baixar os valores.
+"""
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import httplib2
+from googleapiclient.discovery import build_from_document
+from oauth2client.service_account import ServiceAccountCredentials
+
+from settings import (SHEETS_KEYFILE, SHEETS_DISCOVERY_FILE, SHEETS_TOKEN_MARGIN,
+                      SHEETS_TIMEOUT, SHEETS_WORKERS)
+
+
+SCOPES = [
+    'https://www.googleapis.com/auth/spreadsheets.readonly',
+    'https://www.googleapis.com/auth/drive.metadata.readonly',
+]
+DISCOVERY_URL = 'https://sheets.googleapis.com/$discovery/rest?version=v4'
+DRIVE_FILE_URL = 'https://www.googleapis.com/drive/v3/files/{}?fields=version'
+
+# threads dedicadas às chamadas bloqueantes ao Google
+sheets_executor = ThreadPoolExecutor(
+    max_workers=SHEETS_WORKERS,
+    thread_name_prefix='sheets'
+)
+
+
+def load_discovery_document(path):
+    """
+    Retorna o documento de discovery da API do Sheets. Caso ainda não exista
+    em disco, é baixado uma vez e salvo em `path`.
+
+    param : path : <str> : caminho do documento salvo.
+
+    return : <str>
+    """
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    response, content = httplib2.Http(timeout=SHEETS_TIMEOUT).request(DISCOVERY_URL)
+    if response.status != 200:
+        raise Exception(f'Erro ao buscar o discovery do Sheets: {response.status}')
+
+    document = content.decode('utf-8')
+    json.loads(document)  # não salva respostas inválidas
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(document)
+
+    return document
+
+
+class SheetsClient:
+    """
+    Client compartilhado da API do Google Sheets.
+
+    O serviço é construído na primeira leitura. Cada thread utiliza sua
+    própria conexão autorizada, pois as conexões do httplib2 não podem ser
+    compartilhadas entre threads.
+
+    param : keyfile : <str> : arquivo de chaves da conta de serviço.
+    param : discovery_file : <str> : documento de discovery salvo em disco.
+    param : refresh_margin : <float> : segundos antes da expiração em que o
+                                        token é renovado.
+    """
+
+    def __init__(self, keyfile, discovery_file, refresh_margin):
+        self.keyfile = keyfile
+        self.discovery_file = discovery_file
+        self.refresh_margin = timedelta(seconds=refresh_margin)
+        self.credentials = None
+        self.service = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._no_revision = set()
+
+    def _build(self):
+        with self._lock:
+            if self.service is not None:
+                return
+
+            credentials = ServiceAccountCredentials.from_json_keyfile_name(
+                self.keyfile,
+                SCOPES
+            )
+            self.service = build_from_document(
+                load_discovery_document(self.discovery_file),
+                credentials=credentials
+            )
+            self.credentials = credentials
+
+    def _http(self):
+        """
+        Conexão autorizada da thread atual.
+        """
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = self._local.http = self.credentials.authorize(
+                httplib2.Http(timeout=SHEETS_TIMEOUT)
+            )
+        return http
+
+    def refresh_token(self, force=False):
+        """
+        Renova o token de acesso caso esteja perto de expirar.
+
+        param : force : <bool> : renova mesmo que o token ainda seja válido.
+
+        return : <bool> : se o token foi renovado.
+        """
+        if self.service is None:
+            self._build()
+
+        def needs_refresh():
+            expiry = self.credentials.token_expiry
+            return (
+                force
+                or self.credentials.access_token is None
+                or expiry is None
+                or expiry - datetime.utcnow() <= self.refresh_margin
+            )
+
+        if not needs_refresh():
+            return False
+
+        with self._lock:
+            # outra thread pode ter renovado enquanto esta aguardava
+            if not needs_refresh():
+                return False
+            self.credentials.refresh(httplib2.Http(timeout=SHEETS_TIMEOUT))
+
+        return True
+
+    def get_values(self, spreadsheet_id, cell_range):
+        """
+        Retorna os valores de um intervalo de células de uma planilha.
+
+        param : spreadsheet_id : <str>
+        param : cell_range : <str> : intervalo no formato 'Aba!A1:F255'
+
+        return : <list>
+        """
+        self.refresh_token()
+
+        result = self.service.spreadsheets().values().get(
+            spreadsheetId=spreadsheet_id, range=cell_range
+        ).execute(http=self._http())
+
+        return result.get('values', [])
+
+    def batch_get(self, spreadsheet_id, cell_ranges):
+        """
+        Retorna os valores de vários intervalos de uma planilha em uma única
+        requisição (values.batchGet).
+
+        param : spreadsheet_id : <str>
+        param : cell_ranges : <list> : intervalos no formato 'Aba!A1:F255'
+
+        return : <dict> : valores de cada intervalo.
+        """
+        self.refresh_token()
+
+        result = self.service.spreadsheets().values().batchGet(
+            spreadsheetId=spreadsheet_id, ranges=list(cell_ranges)
+        ).execute(http=self._http())
+
+        # os intervalos são retornados na ordem em que foram solicitados
+        return {
+            cell_range: value_range.get('values', [])
+            for cell_range, value_range in zip(cell_ranges, result.get('valueRanges', []))
+        }
+
+    def file_revision(self, spreadsheet_id):
+        """
+        Retorna a revisão atual da planilha segundo os metadados do Drive.
+        Caso a conta de serviço não tenha acesso aos metadados, a revisão
+        deixa de ser consultada para esta planilha.
+
+        param : spreadsheet_id : <str>
+
+        return : <str> : revisão da planilha, ou None quando indisponível.
+        """
+        if spreadsheet_id in self._no_revision:
+            return None
+
+        try:
+            self.refresh_token()
+            response, content = self._http().request(DRIVE_FILE_URL.format(spreadsheet_id))
+        except Exception:
+            return None
+
+        if response.status in (401, 403, 404):
+            self._no_revision.add(spreadsheet_id)
+            return None
+
+        if response.status != 200:
+            return None
+
+        return json.loads(content.decode('utf-8')).get('version')
+
+
+sheets_client = SheetsClient(SHEETS_KEYFILE, SHEETS_DISCOVERY_FILE, SHEETS_TOKEN_MARGIN)
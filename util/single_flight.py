@@ -0,0 +1,156 @@
+"""
+Módulo para agrupamento de requisições idênticas e simultâneas (single-flight).
+
+Enquanto uma requisição para uma chave estiver em andamento, novas chamadas
+para a mesma chave não geram outra requisição: aguardam a que já está em
+andamento e recebem o mesmo resultado.
+"""
+import asyncio
+import threading
+
+
+class _Call:
+    """
+    Requisição síncrona em andamento.
+    """
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Agrupa chamadas simultâneas com a mesma chave em uma única execução.
+
+    Os contadores `executed` e `coalesced` informam quantas chamadas foram de
+    fato executadas e quantas reaproveitaram uma execução em andamento.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._futures = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def stats(self):
+        """
+        Retorna os contadores de chamadas.
+
+        return : <dict>
+        """
+        return {'executed': self.executed, 'coalesced': self.coalesced}
+
+    def do(self, key, function):
+        """
+        Executa `function` uma única vez para chamadas simultâneas de `key`,
+        vindas de threads diferentes.
+
+        param : key : <hashable>
+        param : function : <callable> : função sem parâmetros.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+        except Exception as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    async def async_do(self, key, coroutine_function):
+        """
+        Versão assíncrona de `do`, para chamadas feitas no event loop.
+        O cancelamento de um dos chamadores não cancela a requisição
+        compartilhada com os demais.
+
+        param : key : <hashable>
+        param : coroutine_function : <callable> : retorna a coroutine a executar.
+        """
+        future = self._futures.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            self.executed += 1
+            future = asyncio.ensure_future(coroutine_function())
+            self._futures[key] = future
+            future.add_done_callback(lambda _: self._futures.pop(key, None))
+
+        return await asyncio.shield(future)
+
+    async def async_do_many(self, keys, coroutine_function):
+        """
+        Versão de `async_do` para várias chaves resolvidas juntas. As chaves
+        já em andamento aguardam a execução existente e as demais são
+        executadas em uma única chamada de `coroutine_function`, cujos
+        resultados também atendem quem chegar depois para as mesmas chaves.
+
+        param : keys : <list> : chaves <hashable>.
+        param : coroutine_function : <callable> : recebe a lista das chaves a
+                                                  executar e retorna a coroutine
+                                                  com o resultado, ou a
+                                                  exceção, de cada uma.
+
+        return : <list> : resultado, ou exceção, de cada chave.
+        """
+        loop = asyncio.get_event_loop()
+        futures = []
+        own = {}
+        for key in keys:
+            future = self._futures.get(key)
+            if future is not None:
+                self.coalesced += 1
+            else:
+                self.executed += 1
+                future = own[key] = self._futures[key] = loop.create_future()
+                future.add_done_callback(lambda _, key=key: self._futures.pop(key, None))
+            futures.append(future)
+
+        if own:
+            asyncio.ensure_future(self._resolve(own, coroutine_function))
+
+        # o cancelamento de um dos chamadores não cancela as execuções
+        # compartilhadas com os demais
+        return await asyncio.gather(
+            *[asyncio.shield(future) for future in futures],
+            return_exceptions=True
+        )
+
+    async def _resolve(self, futures, coroutine_function):
+        keys = list(futures)
+        try:
+            results = await coroutine_function(keys)
+        except asyncio.CancelledError:
+            for future in futures.values():
+                future.cancel()
+            raise
+        except Exception as err:
+            results = [err] * len(keys)
+
+        for key, result in zip(keys, results):
+            future = futures[key]
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,345 @@
+"""
+Módulo para cópias em memória de dados externos (snapshots).
+
+Os comandos leem a cópia em memória em vez de consultar o serviço a cada
+chamada. A cópia é atualizada periodicamente em segundo plano e, quando está
+mais velha do que o permitido, continua sendo servida enquanto uma nova cópia
+é buscada (stale-while-revalidate).
+
+Atualizações que não alteram os dados mantêm a cópia anterior: o conteúdo de
+cada parte é identificado por um hash e somente as partes alteradas são
+processadas novamente. Dados derivados da cópia (índices, tabelas, textos
+renderizados) só são reconstruídos quando a cópia de fato muda.
+
+A cópia também pode ser salva em disco a cada alteração e carregada na
+inicialização, permitindo responder com os últimos dados conhecidos antes da
+primeira consulta ao serviço, ou enquanto ele estiver fora do ar.
+"""
+import asyncio
+import hashlib
+import json
+import threading
+from datetime import datetime
+from sys import stdout
+from time import monotonic
+
+from util.files import atomic_write_json
+
+
+def content_hash(value):
+    """
+    Hash do conteúdo de um valor serializável em JSON.
+
+    param : value : <list|dict|str|int>
+
+    return : <str>
+    """
+    content = json.dumps(value, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+class Fingerprinted:
+    """
+    Dados divididos em partes (ex.: intervalos de uma planilha), em que cada
+    parte é processada novamente somente quando o seu conteúdo muda.
+
+    param : processors : <dict> : função de processamento de cada parte;
+                                  partes sem função são mantidas como vieram.
+    """
+
+    def __init__(self, processors=None):
+        self.processors = processors or {}
+        self.digests = {}
+        self.data = None
+        self.rebuilds = 0
+
+    def update(self, parts):
+        """
+        Atualiza os dados com as partes recebidas.
+
+        param : parts : <dict> : conteúdo de cada parte.
+
+        return : <dict> : dados processados. Quando nenhuma parte mudou é
+                          retornado o mesmo objeto da chamada anterior.
+        """
+        previous = self.data or {}
+        changed = set(parts) != set(previous)
+        data = {}
+
+        for key, value in parts.items():
+            digest = content_hash(value)
+            if key in previous and self.digests.get(key) == digest:
+                data[key] = previous[key]
+                continue
+
+            process = self.processors.get(key)
+            data[key] = process(value) if process else value
+            self.digests[key] = digest
+            self.rebuilds += 1
+            changed = True
+
+        if changed or self.data is None:
+            self.data = data
+
+        return self.data
+
+
+class SnapshotFile:
+    """
+    Cópia em disco dos dados de um snapshot, em JSON versionado. O cabeçalho
+    guarda o hash do conteúdo, conferido na leitura.
+
+    param : path : <str> : arquivo onde a cópia é salva.
+    param : restore : <callable> : converte os dados lidos do JSON de volta
+                                   para o formato da cópia em memória.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, path, restore=None):
+        self.path = path
+        self.restore = restore
+
+    def save(self, data, revision=None):
+        """
+        Salva os dados junto com o cabeçalho.
+
+        param : data : dados serializáveis em JSON.
+        param : revision : <str> : revisão da fonte dos dados.
+        """
+        content = {
+            'format': self.FORMAT_VERSION,
+            'hash': content_hash(data),
+            'revision': revision,
+            'saved_at': datetime.utcnow().isoformat(),
+            'data': data,
+        }
+        atomic_write_json(self.path, content)
+
+    def load(self):
+        """
+        Lê a cópia salva.
+
+        return : <tuple> : dados e revisão, ou None quando o arquivo não
+                           existe, é de outro formato ou está corrompido.
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                content = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if content.get('format') != self.FORMAT_VERSION:
+            return None
+
+        if content_hash(content.get('data')) != content.get('hash'):
+            return None
+
+        data = content['data']
+        if self.restore is not None:
+            try:
+                data = self.restore(data)
+            except (KeyError, TypeError, ValueError):
+                # salvo com outra estrutura de dados
+                return None
+
+        return data, content.get('revision')
+
+
+class Snapshot:
+    """
+    Cópia em memória do resultado de `loader`.
+
+    O loader pode retornar o mesmo objeto da cópia atual para indicar que os
+    dados não mudaram. Quando `revision` é informado, a revisão da fonte é
+    consultada antes e, se for a mesma da cópia atual, o loader nem é chamado.
+
+    param : loader : <callable> : função sem parâmetros que busca os dados.
+    param : max_age : <float> : idade, em segundos, a partir da qual uma
+                                 leitura dispara a atualização em segundo plano.
+    param : revision : <callable> : função sem parâmetros que retorna a
+                                    revisão atual da fonte, ou None quando
+                                    não está disponível.
+    param : store : <SnapshotFile> : cópia em disco, salva a cada alteração.
+    param : executor : <Executor> : pool onde as atualizações são executadas;
+                                    por padrão, uma thread por atualização.
+    param : timeout : <float> : prazo, em segundos, das atualizações
+                                aguardadas pelo event loop.
+    """
+
+    def __init__(self, loader, max_age, revision=None, store=None, executor=None,
+                 timeout=None):
+        self.loader = loader
+        self.max_age = max_age
+        self.revision = revision
+        self.store = store
+        self.executor = executor
+        self.timeout = timeout
+        self.data = None
+        self.updated_at = None
+        self.revision_id = None
+        self.version = 0
+        self.refreshes = 0
+        self.unchanged = 0
+        self._derived = {}
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+
+    @property
+    def age(self):
+        """
+        Idade da cópia em segundos, ou None caso ainda não tenha sido carregada.
+        """
+        if self.updated_at is None:
+            return None
+        return monotonic() - self.updated_at
+
+    def get(self):
+        """
+        Retorna a cópia em memória. Somente a primeira leitura aguarda o
+        serviço; cópias velhas são retornadas enquanto são atualizadas.
+        """
+        if self.data is None:
+            return self.refresh()
+
+        if self.age >= self.max_age:
+            self.refresh_in_background()
+
+        return self.data
+
+    def refresh(self):
+        """
+        Busca os dados e substitui a cópia em memória, caso tenham mudado.
+
+        return : dados atualizados.
+        """
+        # atualizações simultâneas são feitas uma de cada vez
+        with self._refresh_lock:
+            return self._refresh()
+
+    def _refresh(self):
+        revision = self.revision() if self.revision is not None else None
+        self.refreshes += 1
+
+        if self.data is not None and revision is not None and revision == self.revision_id:
+            self.updated_at = monotonic()
+            self.unchanged += 1
+            return self.data
+
+        data = self.loader()
+        changed = data is not self.data or revision != self.revision_id
+        if data is self.data:
+            self.unchanged += 1
+        else:
+            self.data = data
+            self.version += 1
+
+        self.revision_id = revision
+        self.updated_at = monotonic()
+
+        if changed and self.store is not None:
+            self._save()
+
+        return data
+
+    async def async_get(self):
+        """
+        Versão de `get` para o event loop: a primeira leitura é feita no pool
+        de atualização, com o prazo de `timeout`.
+        """
+        if self.data is None:
+            return await self.async_refresh()
+        return self.get()
+
+    async def async_refresh(self):
+        """
+        Versão de `refresh` para o event loop: a atualização é feita no pool
+        de atualização, com o prazo de `timeout`.
+        """
+        loop = asyncio.get_event_loop()
+        return await asyncio.wait_for(
+            loop.run_in_executor(self.executor, self.refresh),
+            self.timeout
+        )
+
+    def _save(self):
+        try:
+            self.store.save(self.data, self.revision_id)
+        except Exception as err:
+            # a cópia em memória continua válida
+            stdout.write(f'Erro: {str(err)}\n\n')
+
+    def warm_start(self):
+        """
+        Carrega a cópia salva em disco, caso ainda não haja dados em memória.
+        A cópia carregada é tratada como velha, então a primeira leitura
+        dispara a atualização em segundo plano.
+
+        return : <bool> : se a cópia foi carregada.
+        """
+        if self.store is None or self.data is not None:
+            return False
+
+        saved = self.store.load()
+        if saved is None:
+            return False
+
+        self.data, self.revision_id = saved
+        self.updated_at = monotonic() - self.max_age
+        self.version += 1
+        return True
+
+    def derived(self, name, builder):
+        """
+        Retorna um dado derivado da cópia atual, construído por `builder`
+        somente quando a cópia muda. O resultado é compartilhado entre as
+        chamadas e não deve ser alterado.
+
+        param : name : <str> : identificador do dado derivado.
+        param : builder : <callable> : função que recebe os dados da cópia.
+        """
+        data = self.get()
+        cached = self._derived.get(name)
+        if cached is None or cached[0] is not data:
+            cached = self._derived[name] = (data, builder(data))
+        return cached[1]
+
+    def stats(self):
+        """
+        Retorna os contadores de atualização.
+
+        return : <dict>
+        """
+        return {
+            'version': self.version,
+            'refreshes': self.refreshes,
+            'unchanged': self.unchanged,
+        }
+
+    def refresh_in_background(self):
+        """
+        Atualiza a cópia em uma thread, caso não haja outra atualização em
+        andamento.
+
+        return : <bool> : se a atualização foi iniciada.
+        """
+        with self._lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+
+        if self.executor is not None:
+            self.executor.submit(self._background_refresh)
+        else:
+            threading.Thread(target=self._background_refresh, daemon=True).start()
+        return True
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        except Exception as err:
+            # mantém a cópia anterior até a próxima tentativa
+            stdout.write(f'Erro: {str(err)}\n\n')
+        finally:
+            self._refreshing = False
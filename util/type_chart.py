@@ -0,0 +1,136 @@
+"""
+Módulo para a tabela de tipos dos pokémons.
+
+A tabela 18x18 guarda o multiplicador de dano de cada tipo de ataque (linhas)
+contra cada tipo de defesa (colunas). O multiplicador de um pokémon com dois
+tipos é o produto das duas colunas, calculado para vários pokémons de uma só
+vez, resultando nos valores exatos 0, ¼, ½, 1, 2 e 4, já com as imunidades.
+"""
+import numpy as np
+
+
+TYPES = [
+    'normal', 'fire', 'water', 'electric', 'grass', 'ice',
+    'fighting', 'poison', 'ground', 'flying', 'psychic', 'bug',
+    'rock', 'ghost', 'dragon', 'dark', 'steel', 'fairy',
+]
+
+TYPE_INDEX = {poke_type: i for i, poke_type in enumerate(TYPES)}
+
+# tipo de ataque -> (super efetivo, pouco efetivo, sem efeito)
+_MATCHUPS = {
+    'normal': ([], ['rock', 'steel'], ['ghost']),
+    'fire': (['grass', 'ice', 'bug', 'steel'], ['fire', 'water', 'rock', 'dragon'], []),
+    'water': (['fire', 'ground', 'rock'], ['water', 'grass', 'dragon'], []),
+    'electric': (['water', 'flying'], ['electric', 'grass', 'dragon'], ['ground']),
+    'grass': (
+        ['water', 'ground', 'rock'],
+        ['fire', 'grass', 'poison', 'flying', 'bug', 'dragon', 'steel'],
+        []
+    ),
+    'ice': (['grass', 'ground', 'flying', 'dragon'], ['fire', 'water', 'ice', 'steel'], []),
+    'fighting': (
+        ['normal', 'ice', 'rock', 'dark', 'steel'],
+        ['poison', 'flying', 'psychic', 'bug', 'fairy'],
+        ['ghost']
+    ),
+    'poison': (['grass', 'fairy'], ['poison', 'ground', 'rock', 'ghost'], ['steel']),
+    'ground': (['fire', 'electric', 'poison', 'rock', 'steel'], ['grass', 'bug'], ['flying']),
+    'flying': (['grass', 'fighting', 'bug'], ['electric', 'rock', 'steel'], []),
+    'psychic': (['fighting', 'poison'], ['psychic', 'steel'], ['dark']),
+    'bug': (
+        ['grass', 'psychic', 'dark'],
+        ['fire', 'fighting', 'poison', 'flying', 'ghost', 'steel', 'fairy'],
+        []
+    ),
+    'rock': (['fire', 'ice', 'flying', 'bug'], ['fighting', 'ground', 'steel'], []),
+    'ghost': (['psychic', 'ghost'], ['dark'], ['normal']),
+    'dragon': (['dragon'], ['steel'], ['fairy']),
+    'dark': (['psychic', 'ghost'], ['fighting', 'dark', 'fairy'], []),
+    'steel': (['ice', 'rock', 'fairy'], ['fire', 'water', 'electric', 'steel'], []),
+    'fairy': (['fighting', 'dragon', 'dark'], ['fire', 'poison', 'steel'], []),
+}
+
+
+def _build_chart():
+    chart = np.ones((len(TYPES), len(TYPES)))
+    for attack, (strong, weak, immune) in _MATCHUPS.items():
+        row = TYPE_INDEX[attack]
+        for multiplier, defenses in ((2.0, strong), (0.5, weak), (0.0, immune)):
+            for defense in defenses:
+                chart[row, TYPE_INDEX[defense]] = multiplier
+    return chart
+
+
+# multiplicador de dano: TYPE_CHART[ataque, defesa]
+TYPE_CHART = _build_chart()
+
+# coluna extra de multiplicadores neutros, usada como segundo tipo dos
+# pokémons de um único tipo
+_NO_TYPE = len(TYPES)
+_CHART_COLUMNS = np.hstack([TYPE_CHART, np.ones((len(TYPES), 1))])
+
+
+def _type_pair(types):
+    """
+    Índices das colunas dos tipos de um pokémon.
+
+    param : types : <list> : um ou dois tipos.
+
+    return : <tuple>
+    """
+    indexes = [TYPE_INDEX[poke_type.lower()] for poke_type in types]
+    if not 1 <= len(indexes) <= 2:
+        raise ValueError(f'Quantidade de tipos inválida: {types}')
+    return indexes[0], indexes[1] if len(indexes) == 2 else _NO_TYPE
+
+
+def effectiveness_matrix(type_combinations):
+    """
+    Calcula, de uma só vez, os multiplicadores de todos os tipos de ataque
+    contra cada combinação de tipos.
+
+    param : type_combinations : <list> : tipos de cada pokémon.
+
+    return : <numpy.ndarray> : matriz (combinações x 18 tipos de ataque).
+    """
+    pairs = np.array([_type_pair(types) for types in type_combinations]).reshape(-1, 2)
+    return (_CHART_COLUMNS[:, pairs[:, 0]] * _CHART_COLUMNS[:, pairs[:, 1]]).T
+
+
+def type_effectiveness(types):
+    """
+    Multiplicador de cada tipo de ataque contra um pokémon.
+
+    param : types : <list> : tipos do pokémon.
+
+    return : <dict> : tipo de ataque -> multiplicador. Vazio caso algum tipo
+                      seja desconhecido.
+    """
+    try:
+        row = effectiveness_matrix([types])[0]
+    except (KeyError, ValueError):
+        return {}
+    return {poke_type: float(multiplier) for poke_type, multiplier in zip(TYPES, row)}
+
+
+def precompute_effectiveness(pokemon_types):
+    """
+    Calcula os multiplicadores de vários pokémons em uma única operação.
+
+    param : pokemon_types : <dict> : nome do pokémon -> tipos.
+
+    return : <dict> : nome do pokémon -> {tipo de ataque: multiplicador}
+    """
+    names = [
+        name for name, types in pokemon_types.items()
+        if types and all(poke_type.lower() in TYPE_INDEX for poke_type in types)
+    ]
+    if not names:
+        return {}
+
+    matrix = effectiveness_matrix([pokemon_types[name] for name in names])
+    return {
+        name: dict(zip(TYPES, row.tolist()))
+        for name, row in zip(names, matrix)
+    }